@@ -0,0 +1 @@
+__all__ = ["generators", "scaling", "parallel", "suite"]
\ No newline at end of file
@@ -0,0 +1,100 @@
+import math
+import random
+from typing import Callable, Dict, Iterable, Tuple
+
+from core.search_graph import SearchGraph
+
+# Every generator is deterministic for a given (n, seed) and names nodes with
+# zero-padded ids, so sort_key order matches id order.
+
+
+def _graph(n: int, edges: Iterable[Tuple[int, int, bool]]) -> SearchGraph:
+    graph = SearchGraph()
+    for i in range(n):
+        graph.add_node(f"{i:07d}")
+    graph.add_edges(edges)
+    return graph
+
+
+def random_graph(n: int, degree: int=2, seed: int=0) -> SearchGraph:
+    rng = random.Random(seed)
+    return _graph(n, ((rng.randrange(n), rng.randrange(n), rng.random() < 0.5) for _ in range(n * degree)))
+
+
+def chain(n: int, seed: int=0) -> SearchGraph:
+    return _graph(n, ((i, i + 1, False) for i in range(n - 1)))
+
+
+def grid(n: int, seed: int=0) -> SearchGraph:
+    side = max(1, math.isqrt(n))
+    n = side * side
+
+    def edges():
+        for i in range(n):
+            if (i + 1) % side:
+                yield (i, i + 1, False)
+            if i + side < n:
+                yield (i, i + side, False)
+    return _graph(n, edges())
+
+
+def balanced_tree(n: int, seed: int=0, branching: int=3) -> SearchGraph:
+    return _graph(n, (((i - 1) // branching, i, False) for i in range(1, n)))
+
+
+def erdos_renyi(n: int, seed: int=0, average_degree: float=4.0) -> SearchGraph:
+    rng = random.Random(seed)
+    m = int(n * average_degree / 2)
+    return _graph(n, ((rng.randrange(n), rng.randrange(n), False) for _ in range(m)))
+
+
+# Barabasi-Albert preferential attachment: each new node links to m earlier
+# nodes picked proportionally to their degree.
+def power_law(n: int, seed: int=0, m: int=3) -> SearchGraph:
+    rng = random.Random(seed)
+
+    def edges():
+        endpoints = list(range(min(m, n)))
+        for i in range(min(m, n), n):
+            targets = {rng.choice(endpoints) for _ in range(m)}
+            for target in targets:
+                yield (i, target, False)
+                endpoints.append(target)
+            endpoints.extend([i] * len(targets))
+    return _graph(n, edges())
+
+
+def small_components(n: int, seed: int=0, size: int=5) -> SearchGraph:
+    rng = random.Random(seed)
+
+    def edges():
+        for start in range(0, n, size):
+            members = range(start, min(start + size, n))
+            for node in members[1:]:
+                yield (rng.choice(members[:node - start]), node, False)
+    return _graph(n, edges())
+
+
+# Every node gets `degree` random neighbours, each joined by `parallel`
+# directed edges pointing either way, like stacked Edge objects on a canvas.
+def dense_multigraph(n: int, seed: int=0, degree: int=32, parallel: int=3) -> SearchGraph:
+    rng = random.Random(seed)
+
+    def edges():
+        for node in range(n):
+            for _ in range(min(degree, n - 1)):
+                adj = rng.randrange(n)
+                for _ in range(parallel):
+                    yield (node, adj, True) if rng.random() < 0.5 else (adj, node, True)
+    return _graph(n, edges())
+
+
+GENERATORS: Dict[str, Callable[..., SearchGraph]] = {
+    "chain": chain,
+    "grid": grid,
+    "balanced_tree": balanced_tree,
+    "erdos_renyi": erdos_renyi,
+    "power_law": power_law,
+    "small_components": small_components,
+    "dense_multigraph": dense_multigraph,
+}
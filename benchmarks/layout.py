@@ -0,0 +1,26 @@
+import sys
+import time
+from typing import List
+
+from benchmarks.generators import random_graph
+from core.layout import ForceLayout, tree_layout
+
+SIZES = [1_000, 10_000, 50_000]
+
+
+def run(sizes: List[int], generator=random_graph):
+    print(f"{'layout':<8}{'nodes':>10}{'steps':>8}{'seconds':>10}{'ms/step':>10}")
+    for n in sizes:
+        graph = generator(n)
+        start = time.perf_counter()
+        tree_layout(graph, 0)
+        elapsed = time.perf_counter() - start
+        print(f"{'tree':<8}{n:>10}{1:>8}{elapsed:>10.3f}{elapsed * 1e3:>10.1f}")
+        start = time.perf_counter()
+        layout = ForceLayout(graph).run()
+        elapsed = time.perf_counter() - start
+        print(f"{'force':<8}{n:>10}{layout.iterations:>8}{elapsed:>10.3f}{elapsed / layout.iterations * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or SIZES)
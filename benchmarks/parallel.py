@@ -0,0 +1,31 @@
+import os
+import sys
+import time
+
+from benchmarks.generators import random_graph
+from core.parallel_bfs import parallel_bfs
+from search_algos import location
+
+
+def run(n: int, degree: int=8, worker_counts=(1, 2, 4, 8)):
+    graph = random_graph(n, degree=degree)
+    edges = len(graph.csr()[1])
+    searcher = location()
+    searcher.set_graph(graph)
+    print(f"{n} nodes, {edges} adjacency entries, {os.cpu_count()} cpus")
+    print(f"{'engine':<12}{'seconds':>10}{'Medges/s':>10}")
+
+    start = time.perf_counter()
+    searcher.bfs(0)
+    elapsed = time.perf_counter() - start
+    print(f"{'bfs':<12}{elapsed:>10.3f}{edges / elapsed / 1e6:>10.2f}")
+
+    for workers in worker_counts:
+        start = time.perf_counter()
+        parallel_bfs(graph, 0, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"{'parallel x' + str(workers):<12}{elapsed:>10.3f}{edges / elapsed / 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,49 @@
+import sys
+import time
+from itertools import islice
+from typing import List
+
+from benchmarks.generators import chain, random_graph
+from search_algos import location
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def run(sizes: List[int], algorithms=("bfs", "dfs"), generator=random_graph):
+    searcher = location()
+    print(f"{'algo':<6}{'nodes':>10}{'seconds':>10}{'us/node':>10}")
+    for n in sizes:
+        graph = generator(n)
+        searcher.set_graph(graph)
+        for name in algorithms:
+            start = time.perf_counter()
+            visited, _ = getattr(searcher, name)(0)
+            elapsed = time.perf_counter() - start
+            assert len(visited) == n
+            print(f"{name:<6}{n:>10}{elapsed:>10.3f}{elapsed / n * 1e6:>10.2f}")
+
+
+# Taking the first k steps of a lazy search must not pay for the whole
+# graph: restart roots are only produced once src's component is exhausted,
+# so no node ids may be sorted before the first steps. Only iter_dfs's
+# up-front path buffers still grow with the graph.
+def first_steps(sizes: List[int], k: int=5, generator=random_graph):
+    searcher = location()
+    searcher.instrument = True
+    print(f"{'first':<6}{'nodes':>10}{'seconds':>10}")
+    for n in sizes:
+        searcher.set_graph(generator(n))
+        for name in ("iter_bfs", "iter_dfs"):
+            start = time.perf_counter()
+            steps = list(islice(getattr(searcher, name)(0), k))
+            elapsed = time.perf_counter() - start
+            assert len(steps) == min(k, n) and searcher.stats.sort_calls == 0
+            print(f"{name[5:]:<6}{n:>10}{elapsed:>10.5f}")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    run(sizes)
+    print("chain:")
+    run(sizes, generator=chain)
+    first_steps(sizes)
@@ -0,0 +1,128 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.generators import GENERATORS
+from core import direction_bfs, hop_distance, parallel_bfs
+from search_algos import location
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+# iddfs enumerates every simple path, so it only runs on acyclic graphs and
+# at sizes where the per-level re-walks stay affordable.
+IDDFS_GRAPHS = {"chain": 2_000, "balanced_tree": 100_000}
+
+
+def engines(searcher: location, graph, src: int, dst: int) -> Dict[str, Callable[[], object]]:
+    runs = {
+        "dfs": lambda: searcher.dfs(src),
+        "bfs": lambda: searcher.bfs(src),
+        "dfs_to_dst": lambda: searcher.dfs(src, dst),
+        "bfs_to_dst": lambda: searcher.bfs(src, dst),
+        "bidirectional_bfs": lambda: searcher.bidirectional_bfs(src, dst),
+        "shortest_path": lambda: searcher.shortest_path(src, dst),
+        "level_bfs": lambda: direction_bfs.level_bfs(graph, src),
+        "hop_distances_x8": lambda: hop_distance.hop_distances(graph, range(src, min(src + 8, graph.size))),
+    }
+    if hop_distance.np is not None:
+        runs["parallel_bfs_x2"] = lambda: parallel_bfs.parallel_bfs(graph, src, workers=2)
+    if hop_distance.csr_matrix is not None:
+        runs["distance_matrix_x8"] = lambda: hop_distance.distance_matrix(graph, list(range(src, min(src + 8, graph.size))))
+    return runs
+
+
+# Times run, then runs it again under tracemalloc. reset is called before
+# each pass so the second one cannot reuse state left by the first, like
+# the BFS tree shortest_path keeps on the searcher.
+def measure(run: Callable[[], object], memory: bool, reset: Callable[[], None]=lambda: None) -> Dict[str, float]:
+    reset()
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    result = {"seconds": seconds}
+    if memory:
+        reset()
+        tracemalloc.start()
+        run()
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def run_suite(sizes: List[int], graphs: List[str], memory=True, log=sys.stderr) -> dict:
+    searcher = location()
+    searcher.cache = None
+    results = []
+    for name in graphs:
+        for n in sizes:
+            graph = GENERATORS[name](n)
+            edges = len(graph.csr()[1])
+            searcher.set_graph(graph)
+            src, dst = 0, graph.size - 1
+            runs = engines(searcher, graph, src, dst)
+            if n <= IDDFS_GRAPHS.get(name, 0):
+                runs["iddfs"] = lambda: searcher.iddfs(src, None)
+            def reset():
+                searcher.search_tree = None
+            for engine, run in runs.items():
+                result = measure(run, memory, reset)
+                result.update(graph=name, nodes=len(graph), edges=edges, engine=engine,
+                              nodes_per_second=len(graph) / result["seconds"],
+                              edges_per_second=edges / result["seconds"])
+                results.append(result)
+                print(f"{name:<18}{n:>9} {engine:<20}{result['seconds']:>9.4f}s", file=log)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+# Pairs runs by (graph, nodes, engine) and flags any whose time grew by more
+# than threshold (a fraction) over the baseline.
+def compare(report: dict, baseline: dict, threshold: float) -> List[str]:
+    previous = {(r["graph"], r["nodes"], r["engine"]): r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get((result["graph"], result["nodes"], result["engine"]))
+        if old is None:
+            continue
+        ratio = result["seconds"] / old["seconds"] if old["seconds"] else 1.0
+        if ratio > 1 + threshold:
+            regressions.append(f"{result['graph']} n={result['nodes']} {result['engine']}: "
+                               f"{old['seconds']:.4f}s -> {result['seconds']:.4f}s ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv: Optional[List[str]]=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every search engine on synthetic graphs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--graphs", nargs="+", choices=sorted(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory pass")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.sizes, args.graphs, memory=not args.no_memory)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(report, json.load(file), args.threshold)
+        for line in regressions:
+            print("REGRESSION", line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
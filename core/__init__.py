@@ -0,0 +1 @@
+__all__ = ["search_graph", "traversal", "hop_distance", "parallel_bfs", "direction_bfs", "graph_file", "ingest", "cache", "components", "instrument"]
\ No newline at end of file
@@ -0,0 +1,94 @@
+import sys
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def result_size(value: Any) -> int:
+    # Counts the containers a search result owns and every element in them:
+    # ids past the small-int range are objects of their own, allocated by the
+    # search, so a list of n ids costs far more than the list's pointer array.
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(result_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(result_size(key) + result_size(item) for key, item in value.items())
+    return size
+
+
+# Copies the lists and dicts of a result, down to its elements, so a caller
+# that edits what it got back cannot change the entry every later hit sees.
+def copy_result(value: Any) -> Any:
+    if isinstance(value, list):
+        return [copy_result(item) for item in value]
+    if isinstance(value, dict):
+        return {key: copy_result(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        items = [copy_result(item) for item in value]
+        return value._make(items) if hasattr(value, "_make") else tuple(items)
+    return value
+
+
+# LRU cache of search results. Keys carry the graph and its version counter,
+# so any mutation makes older entries unreachable; they age out under the
+# entry and byte budgets. Every caller gets its own copy of a result, and a
+# None result (a search that was cancelled) is never stored. Pass
+# max_bytes=None to lift the byte budget.
+class SearchCache:
+    def __init__(self, max_entries: int=128, max_bytes: Optional[int]=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.sizes = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # A copy of the entry under key, or None on a miss. Only hits are
+    # counted, since a miss is normally followed by get_or_compute.
+    def get(self, key: Hashable) -> Any:
+        if key not in self.entries:
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return copy_result(self.entries[key])
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return copy_result(self.entries[key])
+        self.misses += 1
+        value = compute()
+        if value is None:
+            return value
+        size = result_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return value
+        self.entries[key] = copy_result(value)
+        self.sizes[key] = size
+        self.bytes += size
+        while len(self.entries) > self.max_entries or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            old_key, _ = self.entries.popitem(last=False)
+            self.bytes -= self.sizes.pop(old_key)
+            self.evictions += 1
+        return value
+
+    def clear(self):
+        self.entries.clear()
+        self.sizes.clear()
+        self.bytes = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, self.evictions, len(self.entries), self.bytes)
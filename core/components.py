@@ -0,0 +1,93 @@
+from array import array
+from typing import List, Optional
+
+
+# Weakly connected components as a union-find over node ids. Edge
+# insertions are merged in as they happen; deletions and renames only mark
+# the index dirty and it is rebuilt from the graph on the next query. It also
+# counts adjacency entries without a reverse entry, so a search can tell
+# when the graph is effectively undirected and components equal reachability.
+class ComponentIndex:
+    def __init__(self, graph):
+        self.graph = graph
+        self.dirty = True
+        self.parent = array("q")
+        self.minimum = array("q")
+        self.asymmetric = 0
+        self.sorted_roots: Optional[List[int]] = None
+        self.sorted_version = -1
+
+    def rebuild(self):
+        graph = self.graph
+        self.parent = array("q", range(graph.size))
+        self.minimum = array("q", range(graph.size))
+        self.asymmetric = 0
+        self.dirty = False
+        for node in range(graph.size):
+            if node not in graph:
+                continue
+            for adj in graph.adjacent(node):
+                self.union(node, adj)
+                if not graph.has_edge(adj, node):
+                    self.asymmetric += 1
+        self.sorted_roots = None
+
+    def add_node(self, node_id: int):
+        if not self.dirty:
+            self.parent.append(node_id)
+            self.minimum.append(node_id)
+            self.sorted_roots = None
+
+    def link(self, src: int, dst: int, paired: bool):
+        if not self.dirty:
+            self.union(src, dst)
+            self.asymmetric += -1 if paired else 1
+
+    def invalidate(self):
+        self.dirty = True
+
+    def find(self, node_id: int) -> int:
+        if self.dirty:
+            self.rebuild()
+        parent = self.parent
+        while parent[node_id] != node_id:
+            parent[node_id] = parent[parent[node_id]]
+            node_id = parent[node_id]
+        return node_id
+
+    def union(self, node1: int, node2: int):
+        root1 = self.find(node1)
+        root2 = self.find(node2)
+        if root1 == root2:
+            return
+        if root1 > root2:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        key = self.key
+        if key(self.minimum[root2]) < key(self.minimum[root1]):
+            self.minimum[root1] = self.minimum[root2]
+        self.sorted_roots = None
+
+    def key(self, node_id: int):
+        return self.graph.sort_key(node_id)
+
+    def connected(self, node1: int, node2: int) -> bool:
+        return self.find(node1) == self.find(node2)
+
+    @property
+    def symmetric(self) -> bool:
+        if self.dirty:
+            self.rebuild()
+        return self.asymmetric == 0
+
+    # The smallest node (by sort_key) of every component, in sort_key order:
+    # exactly where a restarting search enters each component.
+    def roots(self) -> List[int]:
+        if self.dirty:
+            self.rebuild()
+        if self.sorted_roots is None or self.sorted_version != self.graph.version:
+            graph = self.graph
+            roots = [self.minimum[node] for node in range(graph.size) if node in graph and self.find(node) == node]
+            self.sorted_roots = sorted(roots, key=self.key)
+            self.sorted_version = graph.version
+        return self.sorted_roots
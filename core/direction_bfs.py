@@ -0,0 +1,75 @@
+from array import array
+from typing import List, NamedTuple, Tuple
+
+TOP_DOWN = "top-down"
+BOTTOM_UP = "bottom-up"
+AUTO = "auto"
+UNREACHABLE = -1
+NO_PARENT = -1
+
+
+class LevelStats(NamedTuple):
+    depth: int
+    direction: str
+    frontier: int
+    edges_examined: int
+
+
+# Level-synchronous BFS that expands each level either top-down (frontier
+# nodes scan their out-neighbours) or bottom-up (unvisited nodes scan their
+# in-neighbours for a frontier parent and stop at the first one). In AUTO
+# mode it switches with Beamer's heuristic: go bottom-up once the frontier's
+# out-edges exceed 1/alpha of the unvisited nodes' out-edges while growing,
+# and back top-down once the frontier drops under 1/beta of the nodes.
+def level_bfs(graph, src: int, mode: str=AUTO, alpha: int=14, beta: int=24) -> Tuple[array, array, List[LevelStats]]:
+    adjacent = graph.adjacent
+    reverse_adjacent = graph.reverse_adjacent
+    unvisited = graph.node_ids()
+    node_count = len(unvisited)
+    distances = array("q", [UNREACHABLE]) * graph.size
+    parents = array("q", [NO_PARENT]) * graph.size
+    distances[src] = 0
+    stats: List[LevelStats] = []
+
+    unvisited_edges = sum(len(adjacent(node)) for node in unvisited) - len(adjacent(src))
+    frontier = [src]
+    direction = BOTTOM_UP if mode == BOTTOM_UP else TOP_DOWN
+    depth = 0
+    while frontier:
+        frontier_edges = sum(len(adjacent(node)) for node in frontier)
+        if mode == AUTO:
+            if direction == TOP_DOWN and frontier_edges > unvisited_edges / alpha \
+                    and (not stats or len(frontier) > stats[-1].frontier):
+                direction = BOTTOM_UP
+            elif direction == BOTTOM_UP and len(frontier) < node_count / beta \
+                    and stats and len(frontier) < stats[-1].frontier:
+                direction = TOP_DOWN
+        depth += 1
+        next_frontier: List[int] = []
+        examined = 0
+        if direction == TOP_DOWN:
+            for node in frontier:
+                adjacents = adjacent(node)
+                examined += len(adjacents)
+                for adj in adjacents:
+                    if distances[adj] == UNREACHABLE:
+                        distances[adj] = depth
+                        parents[adj] = node
+                        next_frontier.append(adj)
+        else:
+            in_frontier = bytearray(graph.size)
+            for node in frontier:
+                in_frontier[node] = 1
+            unvisited = [node for node in unvisited if distances[node] == UNREACHABLE]
+            for node in unvisited:
+                for adj in reverse_adjacent(node):
+                    examined += 1
+                    if in_frontier[adj]:
+                        distances[node] = depth
+                        parents[node] = adj
+                        next_frontier.append(node)
+                        break
+        stats.append(LevelStats(depth - 1, direction, len(frontier), examined))
+        unvisited_edges -= sum(len(adjacent(node)) for node in next_frontier)
+        frontier = next_frontier
+    return (distances, parents, stats)
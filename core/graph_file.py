@@ -0,0 +1,264 @@
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional, Tuple
+
+from core.components import ComponentIndex
+
+MAGIC = b"SGRF"
+VERSION = 2
+PREFIX = struct.Struct("<4sI")
+# magic, version, node count, adjacency entry count, name blob length, edge
+# count; version 1 files have no edge count and no edge list.
+HEADER = struct.Struct("<4sIQQQQ")
+HEADER_V1 = struct.Struct("<4sIQQQ")
+
+
+def _padded(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _write(file, data: array):
+    if sys.byteorder != "little":
+        data = array(data.typecode, data)
+        data.byteswap()
+    file.write(data.tobytes())
+
+
+# Layout after the header, every section 8-byte aligned:
+#   offsets      (n + 1) int64   CSR row starts into targets
+#   targets      m int64         out-neighbours, each row in sort_key order
+#   order        n int64         node ids sorted by sort_key (restart order)
+#   name offsets (n + 1) int64   row starts into the name blob
+#   directed     ceil(m / 8)     bit k set when entry k has no reverse entry
+#   names        UTF-8 blob
+#   edge sources e int64         the edge list as drawn: one entry per edge,
+#   edge targets e int64         parallel edges and self-loops included
+#   edge flags   e bytes         1 when the edge is directed
+# Deleted ids are dropped, so the saved ids are dense. The adjacency alone
+# cannot tell a directed pair a -> b, b -> a from one undirected edge, nor
+# count parallel edges, so callers that have the real edges (the canvas)
+# pass them; otherwise one edge per linked pair is derived from it.
+def save(graph, path: str, edges: Optional[Iterable[Tuple[int, int, bool]]]=None):
+    live = [node_id for node_id in range(graph.size) if node_id in graph]
+    new_ids = {node_id: i for i, node_id in enumerate(live)}
+
+    offsets = array("q", [0])
+    targets = array("q")
+    directed = bytearray()
+    for node_id in live:
+        for adj in graph.adjacent(node_id):
+            k = len(targets)
+            if k % 8 == 0:
+                directed.append(0)
+            if not graph.has_edge(adj, node_id):
+                directed[k >> 3] |= 1 << (k & 7)
+            targets.append(new_ids[adj])
+        offsets.append(len(targets))
+    order = array("q", (new_ids[node_id] for node_id in graph.node_ids()))
+
+    edge_sources = array("q")
+    edge_targets = array("q")
+    edge_flags = bytearray()
+    if edges is None:
+        edges = _derived_edges(offsets, targets, directed)
+    else:
+        edges = ((new_ids[node1], new_ids[node2], edge_directed) for node1, node2, edge_directed in edges)
+    for node1, node2, edge_directed in edges:
+        edge_sources.append(node1)
+        edge_targets.append(node2)
+        edge_flags.append(1 if edge_directed else 0)
+
+    name_offsets = array("q", [0])
+    blob = bytearray()
+    for node_id in live:
+        blob += graph.name(node_id).encode("utf-8")
+        name_offsets.append(len(blob))
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(live), len(targets), len(blob), len(edge_flags)))
+        file.write(bytes(_padded(HEADER.size) - HEADER.size))
+        for section in (offsets, targets, order, name_offsets):
+            _write(file, section)
+        file.write(directed)
+        file.write(bytes(_padded(len(directed)) - len(directed)))
+        file.write(blob)
+        file.write(bytes(_padded(len(blob)) - len(blob)))
+        for section in (edge_sources, edge_targets):
+            _write(file, section)
+        file.write(edge_flags)
+
+
+# One edge per linked pair, read off the adjacency: an entry whose directed
+# bit is set is a one-way edge, and a mutual pair is one undirected edge.
+def _derived_edges(offsets, targets, directed) -> Iterator[Tuple[int, int, bool]]:
+    for node in range(len(offsets) - 1):
+        for k in range(offsets[node], offsets[node + 1]):
+            adj = targets[k]
+            one_way = bool(directed[k >> 3] & (1 << (k & 7)))
+            if one_way or node < adj:
+                yield (node, adj, one_way)
+
+
+# Read-only graph served straight from a memory-mapped file: opening only
+# parses the header, and adjacent() returns zero-copy slices of the mapping.
+class MappedGraph:
+    version = 0
+
+    def __init__(self, path: str):
+        if sys.byteorder != "little":
+            raise ValueError("MappedGraph needs a little-endian host")
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = PREFIX.unpack_from(self.map)
+        if magic != MAGIC or version not in (1, VERSION):
+            self.close()
+            raise ValueError(f"{path} is not a version 1 or {VERSION} graph file")
+        if version == 1:
+            magic, version, n, m, blob_size = HEADER_V1.unpack_from(self.map)
+            e = 0
+            header_size = HEADER_V1.size
+        else:
+            magic, version, n, m, blob_size, e = HEADER.unpack_from(self.map)
+            header_size = HEADER.size
+        self.node_count = n
+        self.format_version = version
+        self.entry_count = m
+
+        view = memoryview(self.map)
+        self.views = [view]
+        position = _padded(header_size)
+
+        def section(size: int, typecode: Optional[str]="q"):
+            nonlocal position
+            data = view[position:position + size]
+            position += _padded(size)
+            if typecode is not None:
+                data = data.cast(typecode)
+            self.views.append(data)
+            return data
+
+        self.offsets = section((n + 1) * 8)
+        self.targets = section(m * 8)
+        self.order = section(n * 8)
+        self.name_offsets = section((n + 1) * 8)
+        self.directed = section((m + 7) // 8, None)
+        self.blob = section(blob_size, None)
+        self.edge_count = e
+        self.edge_sources = section(e * 8)
+        self.edge_targets = section(e * 8)
+        self.edge_flags = section(e, None)
+        self.reverse: Optional[Tuple[array, array]] = None
+        self.component_index: Optional[ComponentIndex] = None
+
+    @property
+    def size(self):
+        return self.node_count
+
+    def __len__(self):
+        return self.node_count
+
+    def __contains__(self, node_id):
+        return 0 <= node_id < self.node_count
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.order)
+
+    def adjacent(self, node_id: int):
+        return self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+    # The file only stores out-edges; the in-edge CSR is built on first use.
+    def reverse_adjacent(self, node_id: int):
+        if self.reverse is None:
+            counts = array("q", [0]) * (self.node_count + 1)
+            for adj in self.targets:
+                counts[adj + 1] += 1
+            for i in range(self.node_count):
+                counts[i + 1] += counts[i]
+            fill = array("q", counts)
+            sources = array("q", [0]) * self.entry_count
+            for node in range(self.node_count):
+                for adj in self.adjacent(node):
+                    sources[fill[adj]] = node
+                    fill[adj] += 1
+            self.reverse = (counts, sources)
+        offsets, sources = self.reverse
+        return sources[offsets[node_id]:offsets[node_id + 1]]
+
+    def has_edge(self, node1: int, node2: int) -> bool:
+        adjacents = self.adjacent(node1)
+        i = bisect_left(adjacents, self.sort_key(node2), key=self.sort_key)
+        return i < len(adjacents) and adjacents[i] == node2
+
+    # (source, target, directed) for every edge as saved; version 1 files
+    # only yield one edge per linked pair.
+    def edges(self) -> Iterator[Tuple[int, int, bool]]:
+        if self.format_version == 1:
+            yield from _derived_edges(self.offsets, self.targets, self.directed)
+            return
+        for node1, node2, flag in zip(self.edge_sources, self.edge_targets, self.edge_flags):
+            yield (node1, node2, bool(flag))
+
+    def components(self) -> ComponentIndex:
+        if self.component_index is None:
+            self.component_index = MappedComponentIndex(self)
+        return self.component_index
+
+    def csr(self):
+        return (self.offsets, self.targets)
+
+    def node_ids(self):
+        return self.order
+
+    def name(self, node_id: int) -> str:
+        return bytes(self.blob[self.name_offsets[node_id]:self.name_offsets[node_id + 1]]).decode("utf-8")
+
+    def sort_key(self, node_id: int):
+        return (self.name(node_id), node_id)
+
+    def find(self, name: str) -> Optional[int]:
+        i = bisect_left(self.order, name, key=self.name)
+        if i < self.node_count and self.name(self.order[i]) == name:
+            return self.order[i]
+        return None
+
+    # The file is never modified, so it is already its own snapshot.
+    def snapshot(self) -> "MappedGraph":
+        return self
+
+    def close(self):
+        for data in reversed(self.views):
+            data.release()
+        self.views = []
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ComponentIndex that never decodes a name: the saved directed bitmap already
+# marks every entry without a reverse entry, and component minima compare by
+# their rank in the stored sort_key order.
+class MappedComponentIndex(ComponentIndex):
+    def rebuild(self):
+        graph = self.graph
+        self.rank = array("q", [0]) * graph.size
+        for i, node in enumerate(graph.order):
+            self.rank[node] = i
+        self.parent = array("q", range(graph.size))
+        self.minimum = array("q", range(graph.size))
+        self.dirty = False
+        for node in range(graph.size):
+            for adj in graph.adjacent(node):
+                self.union(node, adj)
+        self.asymmetric = int.from_bytes(graph.directed, "little").bit_count()
+        self.sorted_roots = None
+
+    def key(self, node_id: int):
+        return self.rank[node_id]
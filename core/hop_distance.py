@@ -0,0 +1,85 @@
+from array import array
+from typing import List, Optional, Sequence
+
+from core.instrument import SearchStats
+
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix
+except ImportError:
+    np = None
+    csr_matrix = None
+
+UNREACHABLE = -1
+
+
+# Multi-source BFS where every node carries an int bitmask of the sources
+# whose frontier currently contains it, so one pass over an edge advances
+# all of those sources at once. Every edge out of a level counts as scanned,
+# and one that adds no new source to its target as a duplicate check.
+def hop_distances(graph, sources: Sequence[int], stats: Optional[SearchStats]=None) -> List[array]:
+    distances = [array("q", [UNREACHABLE]) * graph.size for _ in sources]
+    adjacent = graph.adjacent
+    seen = [0] * graph.size
+    frontier = {}
+    for bit, src in enumerate(sources):
+        distances[bit][src] = 0
+        seen[src] |= 1 << bit
+        frontier[src] = frontier.get(src, 0) | (1 << bit)
+
+    depth = 0
+    while frontier:
+        depth += 1
+        reached = {}
+        scanned = 0
+        for node, mask in frontier.items():
+            adjacents = adjacent(node)
+            for adj in adjacents:
+                reached[adj] = reached.get(adj, 0) | mask
+            if stats is not None:
+                stats.expand(len(frontier))
+                scanned += len(adjacents)
+        frontier = {}
+        for node, mask in reached.items():
+            new = mask & ~seen[node]
+            if not new:
+                continue
+            seen[node] |= new
+            frontier[node] = new
+            while new:
+                low = new & -new
+                distances[low.bit_length() - 1][node] = depth
+                new ^= low
+        if stats is not None:
+            stats.scan(scanned, scanned - len(frontier))
+    return distances
+
+
+# Level-synchronous BFS as sparse matrix products: each column of the
+# frontier matrix is one source, so a batch of sources advances per product.
+def distance_matrix(graph, sources: Sequence[int], batch_size: int=64):
+    if csr_matrix is None:
+        raise ImportError("distance_matrix requires numpy and scipy")
+    n = graph.size
+    offsets, targets = graph.csr()
+    indptr = np.frombuffer(offsets, dtype=np.int64)
+    indices = np.frombuffer(targets, dtype=np.int64)
+    reverse = csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr), shape=(n, n)).T.tocsr()
+
+    sources = np.asarray(sources, dtype=np.int64)
+    distances = np.full((len(sources), n), UNREACHABLE, dtype=np.int32)
+    for start in range(0, len(sources), batch_size):
+        batch = sources[start:start + batch_size]
+        columns = np.arange(len(batch))
+        frontier = np.zeros((n, len(batch)), dtype=bool)
+        frontier[batch, columns] = True
+        visited = frontier.copy()
+        distances[start + columns, batch] = 0
+        depth = 0
+        while frontier.any():
+            depth += 1
+            frontier = (reverse @ frontier.astype(np.float32) > 0) & ~visited
+            visited |= frontier
+            rows, cols = np.nonzero(frontier)
+            distances[start + cols, rows] = depth
+    return distances
@@ -0,0 +1,128 @@
+import csv
+import os
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.search_graph import SearchGraph
+
+DIRECTED_VALUES = {"1", "true", "t", "yes", "y", "directed", "d"}
+COMMENT_PREFIXES = ("#", "%")
+
+
+def delimiter_for(path: str) -> Optional[str]:
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return ","
+    if extension == ".tsv":
+        return "\t"
+    return None
+
+
+# Streams an edge list into a SearchGraph, reading chunk_size bytes at a time
+# so memory tracks the graph being built rather than the file. Rows are
+# "source target [directed] [weight]" in the given columns; names are
+# interned to ids (reusing nodes already in graph) and the sorted adjacency
+# index is rebuilt once at the end. A weight column only filters: rows below
+# min_weight are skipped, since every search here counts hops.
+# progress(bytes_read, total_bytes, edges_added) is called after each chunk
+# and once more after a final line without a newline.
+def ingest(path: str, graph: Optional[SearchGraph]=None, delimiter: Optional[str]="auto",
+           source_column: int=0, target_column: int=1, directed=False,
+           directed_column: Optional[int]=None, weight_column: Optional[int]=None,
+           min_weight: Optional[float]=None, skip_header=False, chunk_size: int=1 << 20,
+           progress: Optional[Callable[[int, int, int], None]]=None) -> SearchGraph:
+    if graph is None:
+        graph = SearchGraph()
+    if delimiter == "auto":
+        delimiter = delimiter_for(path)
+    ids: Dict[str, int] = {graph.name(node_id): node_id for node_id in graph.node_ids()}
+    needed = max(column for column in (source_column, target_column, directed_column, weight_column) if column is not None)
+
+    def intern(name: str) -> int:
+        node_id = ids.get(name)
+        if node_id is None:
+            node_id = graph.add_node(name)
+            ids[name] = node_id
+        return node_id
+
+    def parse(text: str, first_line: int) -> List[Tuple[int, int, bool]]:
+        lines = text.splitlines()
+        rows = csv.reader(lines, delimiter=delimiter) if delimiter is not None else (line.split() for line in lines)
+        edges = []
+        for line_no, row in enumerate(rows, first_line):
+            if not row or not row[0].strip() or row[0].lstrip().startswith(COMMENT_PREFIXES):
+                continue
+            if len(row) <= needed:
+                raise ValueError(f"{path}:{line_no}: expected at least {needed + 1} columns, got {len(row)}")
+            if weight_column is not None and min_weight is not None:
+                try:
+                    if float(row[weight_column]) < min_weight:
+                        continue
+                except ValueError:
+                    raise ValueError(f"{path}:{line_no}: bad weight {row[weight_column]!r}") from None
+            edge_directed = directed if directed_column is None else row[directed_column].strip().lower() in DIRECTED_VALUES
+            edges.append((intern(row[source_column].strip()), intern(row[target_column].strip()), edge_directed))
+        return edges
+
+    total = os.path.getsize(path)
+    read = 0
+    added = 0
+    line_no = 1
+    touched = set()
+    tail = b""
+    # Rows already added stay in graph if a later row is malformed, so the
+    # sorted index is rebuilt for them even when parsing raises.
+    try:
+        with open(path, "rb") as file:
+            if skip_header:
+                header = file.readline()
+                read += len(header)
+                line_no += 1
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                read += len(chunk)
+                data = tail + chunk
+                cut = data.rfind(b"\n") + 1
+                data, tail = data[:cut], data[cut:]
+                if data:
+                    edges = parse(data.decode("utf-8"), line_no)
+                    line_no += data.count(b"\n")
+                    touched |= graph.add_edges(edges, sort=False)
+                    added += len(edges)
+                if progress is not None:
+                    progress(read, total, added)
+            if tail:
+                edges = parse(tail.decode("utf-8"), line_no)
+                touched |= graph.add_edges(edges, sort=False)
+                added += len(edges)
+                if progress is not None:
+                    progress(read, total, added)
+    finally:
+        graph.sort_adjacent(touched)
+    return graph
+
+
+if __name__ == "__main__":
+    import argparse
+    from core import graph_file
+
+    parser = argparse.ArgumentParser(description="Convert an edge list into a binary graph file.")
+    parser.add_argument("edge_list")
+    parser.add_argument("output")
+    parser.add_argument("--skip-header", action="store_true")
+    parser.add_argument("--directed", action="store_true", help="treat every edge as directed")
+    parser.add_argument("--directed-column", type=int)
+    parser.add_argument("--weight-column", type=int)
+    parser.add_argument("--min-weight", type=float)
+    args = parser.parse_args()
+
+    def report(read: int, total: int, edges: int):
+        print(f"\r{read / max(total, 1):6.1%}  {edges} edges", end="", file=sys.stderr)
+
+    graph = ingest(args.edge_list, directed=args.directed, directed_column=args.directed_column,
+                   weight_column=args.weight_column, min_weight=args.min_weight,
+                   skip_header=args.skip_header, progress=report)
+    print(f"\n{len(graph)} nodes", file=sys.stderr)
+    graph_file.save(graph, args.output)
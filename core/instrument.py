@@ -0,0 +1,73 @@
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import Dict, List, Optional
+
+
+# Counters for one search. The traversal engines take an optional stats
+# argument and only touch it once per node, so a search run with None pays
+# a single identity test per expansion and nothing per edge.
+class SearchStats:
+    def __init__(self, engine: str):
+        self.engine = engine
+        self.nodes_expanded = 0
+        self.edges_scanned = 0
+        self.duplicate_checks = 0
+        self.peak_frontier = 0
+        self.sort_calls = 0
+        self.restarts = 0
+        self.cache_hit = False
+        self.phases: Dict[str, float] = {}
+
+    def expand(self, frontier: int):
+        self.nodes_expanded += 1
+        if frontier > self.peak_frontier:
+            self.peak_frontier = frontier
+
+    def scan(self, edges: int, duplicates: int):
+        self.edges_scanned += edges
+        self.duplicate_checks += duplicates
+
+    @contextmanager
+    def phase(self, name: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + perf_counter() - start
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.phases.values())
+
+    def as_dict(self) -> dict:
+        return {
+            "engine": self.engine,
+            "nodes_expanded": self.nodes_expanded,
+            "edges_scanned": self.edges_scanned,
+            "duplicate_checks": self.duplicate_checks,
+            "peak_frontier": self.peak_frontier,
+            "sort_calls": self.sort_calls,
+            "restarts": self.restarts,
+            "cache_hit": self.cache_hit,
+            "phases": dict(self.phases),
+        }
+
+    def lines(self) -> List[str]:
+        lines = [
+            f"Stats ({self.engine}{', cached' if self.cache_hit else ''}):",
+            f"  nodes expanded: {self.nodes_expanded}",
+            f"  edges scanned: {self.edges_scanned}",
+            f"  duplicate checks: {self.duplicate_checks}",
+            f"  peak frontier: {self.peak_frontier}",
+            f"  sort calls: {self.sort_calls}",
+            f"  restarts: {self.restarts}",
+        ]
+        lines.extend(f"  {name}: {seconds * 1000:.3f} ms" for name, seconds in self.phases.items())
+        return lines
+
+    def __str__(self):
+        return "\n".join(self.lines())
+
+
+def timed(stats: Optional[SearchStats], name: str):
+    return nullcontext() if stats is None else stats.phase(name)
@@ -0,0 +1,293 @@
+import math
+import random
+from typing import Dict, Optional, Tuple
+
+from core.traversal import iter_bfs
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+Position = Tuple[float, float]
+
+# Ideal edge length in world units, about one node plus a gap at zoom 1.
+SPRING_LENGTH = 80.0
+# The repulsion grid is refined until a node shares its leaf cell with about
+# LEAF_SIZE nodes on average, which bounds the exact near-field pairs, or
+# until it reaches 4**MAX_DEPTH cells.
+LEAF_SIZE = 4
+MAX_DEPTH = 10
+# Pull toward the centroid that keeps disconnected components from drifting.
+GRAVITY = 0.5
+# The layout has settled once the step limit falls below this many spring
+# lengths. It cools geometrically over STEP_BUDGET / n steps, clamped to
+# [MIN_STEPS, MAX_STEPS], so small graphs settle carefully and large ones
+# within a bounded amount of work.
+MIN_TEMPERATURE = 0.05
+STEP_BUDGET = 1_000_000
+MIN_STEPS = 50
+MAX_STEPS = 300
+
+
+# Fruchterman-Reingold layout over the live nodes of a graph: edges pull
+# with d**2 / k, all pairs push with k**2 / d, and every step moves each node
+# at most `temperature`, which then cools. Repulsion is approximated
+# Barnes-Hut style on a quadtree of uniform grids (see repulsion), so one
+# step costs O(n log n).
+#
+# Nodes with a position in `positions` start there and the rest start near
+# their placed neighbours, so a relayout after a few edits only settles the
+# new part. step() does a bounded amount of work, leaving the caller free to
+# redraw or give up between steps.
+class ForceLayout:
+    def __init__(self, graph, positions: Optional[Dict[int, Position]]=None, k: float=SPRING_LENGTH,
+                 temperature: Optional[float]=None, seed: int=0):
+        if np is None:
+            raise ImportError("ForceLayout requires numpy")
+        positions = positions or {}
+        self.k = k
+        self.node_ids = np.array([i for i in range(graph.size) if i in graph], dtype=np.int64)
+        n = len(self.node_ids)
+        index = np.full(graph.size, -1, dtype=np.int64)
+        index[self.node_ids] = np.arange(n)
+
+        # Each linked pair pulls once, whichever way its edges point.
+        offsets, targets = graph.csr()
+        counts = np.diff(np.frombuffer(offsets, dtype=np.int64))
+        src = index[np.repeat(np.arange(graph.size), counts)]
+        dst = index[np.frombuffer(targets, dtype=np.int64)]
+        pairs = np.unique(np.minimum(src, dst) * n + np.maximum(src, dst))
+        self.edges = (pairs // n, pairs % n)
+
+        self.pos = self.initial_positions(graph, positions, seed)
+        if temperature is None:
+            # A drawing with every node already placed only needs refining.
+            fresh = n and any(node_id not in positions for node_id in self.node_ids.tolist())
+            temperature = max(k, float(np.ptp(self.pos, axis=0).max()) / 10) if fresh else k
+        self.temperature = temperature
+        steps = min(MAX_STEPS, max(MIN_STEPS, STEP_BUDGET // max(n, 1)))
+        self.cooling = (k * MIN_TEMPERATURE / max(temperature, k * MIN_TEMPERATURE)) ** (1 / steps)
+        self.iterations = 0
+
+    def initial_positions(self, graph, positions: Dict[int, Position], seed: int) -> "np.ndarray":
+        n = len(self.node_ids)
+        pos = np.empty((n, 2))
+        if n == 0:
+            return pos
+        rng = random.Random(seed)
+        side = self.k * math.sqrt(n)
+        placed = np.zeros(n, dtype=bool)
+        for i, node_id in enumerate(self.node_ids.tolist()):
+            position = positions.get(node_id)
+            if position is not None:
+                pos[i] = position
+                placed[i] = True
+        if not placed.any():
+            pos[:] = [(rng.uniform(0, side), rng.uniform(0, side)) for _ in range(n)]
+            return pos
+        # New nodes go beside their placed neighbours, or scattered around
+        # the existing drawing when they have none.
+        center = pos[placed].mean(axis=0)
+        index = {node_id: i for i, node_id in enumerate(self.node_ids.tolist())}
+        for i in np.flatnonzero(~placed).tolist():
+            node_id = int(self.node_ids[i])
+            near = [index[adj] for adj in graph.adjacent(node_id)] + [index[adj] for adj in graph.reverse_adjacent(node_id)]
+            near = [j for j in near if placed[j]]
+            base = pos[near].mean(axis=0) if near else center
+            pos[i] = base + (rng.uniform(-self.k, self.k), rng.uniform(-self.k, self.k))
+        return pos
+
+    @property
+    def settled(self) -> bool:
+        return self.temperature < self.k * MIN_TEMPERATURE or len(self.pos) < 2
+
+    # Runs up to `iterations` steps; False once the layout has settled.
+    def step(self, iterations: int=1) -> bool:
+        for _ in range(iterations):
+            if self.settled:
+                return False
+            force = repulsion(self.pos, self.k)
+            force += attraction(self.pos, self.edges, self.k)
+            force -= (self.pos - self.pos.mean(axis=0)) * GRAVITY
+            length = np.hypot(force[:, 0], force[:, 1])
+            scale = np.minimum(length, self.temperature) / np.maximum(length, 1e-12)
+            self.pos += force * scale[:, None]
+            self.temperature *= self.cooling
+            self.iterations += 1
+        return not self.settled
+
+    def run(self, max_iterations: int=1000) -> "ForceLayout":
+        self.step(max_iterations)
+        return self
+
+    def positions(self) -> Dict[int, Position]:
+        return dict(zip(self.node_ids.tolist(), map(tuple, self.pos.tolist())))
+
+
+def attraction(pos: "np.ndarray", edges: Tuple["np.ndarray", "np.ndarray"], k: float) -> "np.ndarray":
+    src, dst = edges
+    n = len(pos)
+    delta = pos[dst] - pos[src]
+    pull = delta * (np.hypot(delta[:, 0], delta[:, 1]) / k)[:, None]
+    force = np.empty_like(pos)
+    for axis in (0, 1):
+        force[:, axis] = np.bincount(src, pull[:, axis], n) - np.bincount(dst, pull[:, axis], n)
+    return force
+
+
+# Offsets from a cell to its interaction list, by the parity of its x and y.
+INTERACTIONS = {(px, py): [(dx, dy) for dx in range(-2 - px, 4 - px) for dy in range(-2 - py, 4 - py)
+                           if abs(dx) > 1 or abs(dy) > 1]
+                for px in (0, 1) for py in (0, 1)}
+
+
+# Every (cell, interacting cell) pair among the occupied cells ids of one
+# grid level, as indices into ids.
+def _interactions(cx, cy, side, ids):
+    lookup = np.full(side * side, -1, dtype=np.int64)
+    lookup[ids] = np.arange(len(ids))
+    all_targets, all_sources = [], []
+    for (px, py), offsets in INTERACTIONS.items():
+        group = np.flatnonzero(((cx & 1) == px) & ((cy & 1) == py))
+        dx, dy = np.array(offsets).T
+        x = (cx[group] + dx[:, None]).ravel()
+        y = (cy[group] + dy[:, None]).ravel()
+        targets = np.tile(group, len(offsets))
+        inside = (x >= 0) & (x < side) & (y >= 0) & (y < side)
+        sources = lookup[x[inside] * side + y[inside]]
+        full = sources >= 0
+        all_targets.append(targets[inside][full])
+        all_sources.append(sources[full])
+    return (np.concatenate(all_targets), np.concatenate(all_sources))
+
+
+def _push(force, pos, targets, x, y, mass, k2):
+    dx = pos[targets, 0] - x
+    dy = pos[targets, 1] - y
+    d2 = np.maximum(dx * dx + dy * dy, 1e-9)
+    scale = mass * k2 / d2
+    force[:, 0] += np.bincount(targets, dx * scale, len(pos))
+    force[:, 1] += np.bincount(targets, dy * scale, len(pos))
+
+
+# A node pushes exactly on the nodes in its own and neighbouring leaf cells;
+# on every coarser level a cell pushes as its centre of mass on the cells
+# well separated from it but not from its parent.
+def repulsion(pos: "np.ndarray", k: float) -> "np.ndarray":
+    n = len(pos)
+    k2 = k * k
+    force = np.zeros_like(pos)
+    if n < 2:
+        return force
+    low = pos.min(axis=0)
+    span = max(float(np.ptp(pos, axis=0).max()), 1e-9) * (1 + 1e-9)
+    depth = min(MAX_DEPTH, max(1, math.ceil(math.log(n / LEAF_SIZE, 4)) if n > LEAF_SIZE else 1))
+    while True:
+        side = 1 << depth
+        cells = np.minimum(((pos - low) * (side / span)).astype(np.int64), side - 1)
+        occupancy = np.bincount(cells[:, 0] * side + cells[:, 1])
+        if depth == MAX_DEPTH or np.dot(occupancy, occupancy) <= LEAF_SIZE * n:
+            break
+        depth += 1
+
+    # Far field, coarse to fine. The interaction list of a cell is the
+    # children of its parent's 3x3 neighbourhood minus its own neighbourhood.
+    # Their push is summed per occupied cell as a first-order expansion about
+    # the cell's centre of mass, the force there plus its Jacobian, and each
+    # level inherits its parent's expansion, so nodes are only visited once
+    # per level rather than once per interacting cell.
+    expansion = None
+    for level in range(2, depth + 1):
+        side = 1 << level
+        flat = (cells[:, 0] >> (depth - level)) * side + (cells[:, 1] >> (depth - level))
+        ids, inverse = np.unique(flat, return_inverse=True)
+        mass = np.bincount(inverse).astype(float)
+        com_x = np.bincount(inverse, pos[:, 0]) / mass
+        com_y = np.bincount(inverse, pos[:, 1]) / mass
+        cx, cy = ids // side, ids % side
+
+        terms = np.zeros((5, len(ids)))
+        if expansion is not None:
+            parent_ids, parent_terms, parent_x, parent_y = expansion
+            parent = np.searchsorted(parent_ids, (cx >> 1) * (side >> 1) + (cy >> 1))
+            fx, fy, jxx, jxy, jyy = parent_terms[:, parent]
+            rx, ry = com_x - parent_x[parent], com_y - parent_y[parent]
+            terms[:] = (fx + jxx * rx + jxy * ry, fy + jxy * rx + jyy * ry, jxx, jxy, jyy)
+
+        targets, sources = _interactions(cx, cy, side, ids)
+        rx = com_x[targets] - com_x[sources]
+        ry = com_y[targets] - com_y[sources]
+        d2 = np.maximum(rx * rx + ry * ry, 1e-9)
+        scale = mass[sources] * k2 / d2
+        twice = 2 / d2
+        for row, weights in enumerate((rx * scale, ry * scale, scale * (1 - twice * rx * rx),
+                                       -scale * twice * rx * ry, scale * (1 - twice * ry * ry))):
+            terms[row] += np.bincount(targets, weights, len(ids))
+        expansion = (ids, terms, com_x, com_y)
+
+    side = 1 << depth
+    flat = cells[:, 0] * side + cells[:, 1]
+    if expansion is not None:
+        ids, terms, com_x, com_y = expansion
+        leaf = np.searchsorted(ids, flat)
+        fx, fy, jxx, jxy, jyy = terms[:, leaf]
+        rx, ry = pos[:, 0] - com_x[leaf], pos[:, 1] - com_y[leaf]
+        force[:, 0] = fx + jxx * rx + jxy * ry
+        force[:, 1] = fy + jxy * rx + jyy * ry
+
+    # Near field: exact pairs between each leaf and its neighbours.
+    order = np.argsort(flat, kind="stable")
+    counts = np.bincount(flat, minlength=side * side)
+    starts = np.cumsum(counts) - counts
+    for ox in (-1, 0, 1):
+        for oy in (-1, 0, 1):
+            x, y = cells[:, 0] + ox, cells[:, 1] + oy
+            nodes = np.flatnonzero((x >= 0) & (x < side) & (y >= 0) & (y < side))
+            other = x[nodes] * side + y[nodes]
+            count = counts[other]
+            targets = np.repeat(nodes, count)
+            first = np.repeat(starts[other] - (np.cumsum(count) - count), count)
+            sources = order[first + np.arange(len(targets))]
+            distinct = sources != targets
+            targets, sources = targets[distinct], sources[distinct]
+            _push(force, pos, targets, pos[sources, 0], pos[sources, 1], 1, k2)
+    return force
+
+
+# Layered drawing of the BFS forest from root: depth sets the row, and every
+# node is centred over the leaves of its subtree, which take one `spacing`
+# wide slot each. Nodes root cannot reach form further trees to the right,
+# restarting from the lowest unreached id. Linear time, no NumPy needed.
+def tree_layout(graph, root: int, spacing: float=SPRING_LENGTH, level_gap: Optional[float]=None) -> Dict[int, Position]:
+    level_gap = spacing * 1.5 if level_gap is None else level_gap
+    order = []
+    depths: Dict[int, int] = {}
+    children: Dict[int, list] = {}
+    roots = []
+    for node, depth, parent in iter_bfs(graph, root, (i for i in range(graph.size) if i in graph)):
+        order.append(node)
+        depths[node] = depth
+        children[node] = []
+        if parent is None:
+            roots.append(node)
+        else:
+            children[parent].append(node)
+
+    widths: Dict[int, int] = {}
+    for node in reversed(order):
+        widths[node] = sum(widths[child] for child in children[node]) or 1
+
+    starts: Dict[int, int] = {}
+    slot = 0
+    for node in roots:
+        starts[node] = slot
+        slot += widths[node]
+    positions: Dict[int, Position] = {}
+    for node in order:
+        start = starts[node]
+        positions[node] = ((start + widths[node] / 2) * spacing, depths[node] * level_gap)
+        for child in children[node]:
+            starts[child] = start
+            start += widths[child]
+    return positions
@@ -0,0 +1,92 @@
+from multiprocessing import Pool, shared_memory
+from typing import List, Optional
+
+from core.instrument import SearchStats
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+UNREACHABLE = -1
+
+# Views onto the shared blocks, set up once per worker by _attach.
+_shared: dict = {}
+
+
+def _attach(names: List[str], n: int, m: int, workers: int):
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    _shared["blocks"] = blocks
+    _shared["offsets"] = np.ndarray((n + 1,), dtype=np.int64, buffer=blocks[0].buf)
+    _shared["targets"] = np.ndarray((m,), dtype=np.int64, buffer=blocks[1].buf)
+    _shared["visited"] = np.ndarray((n,), dtype=np.uint8, buffer=blocks[2].buf)
+    _shared["frontier"] = np.ndarray((n,), dtype=np.int64, buffer=blocks[3].buf)
+    _shared["next"] = np.ndarray((workers, n), dtype=np.uint8, buffer=blocks[4].buf)
+
+
+# Marks every unvisited neighbour of frontier[lo:hi] in this worker's own
+# row of the next-frontier map, so workers never write to the same memory.
+def _expand(worker: int, lo: int, hi: int) -> int:
+    offsets = _shared["offsets"]
+    frontier = _shared["frontier"][lo:hi]
+    starts = offsets[frontier]
+    counts = offsets[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return 0
+    firsts = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    neighbours = _shared["targets"][firsts + np.arange(total)]
+    neighbours = neighbours[_shared["visited"][neighbours] == 0]
+    _shared["next"][worker, neighbours] = 1
+    return total
+
+
+# Level-synchronous BFS from src whose frontier is split across a process
+# pool. The CSR adjacency, visited map and per-worker next-frontier maps live
+# in shared memory, so only slice bounds cross process boundaries.
+# Returns hop distances indexed by node id (UNREACHABLE if not reached).
+# Stats are kept per level, from the edge counts the workers return.
+def parallel_bfs(graph, src: int, workers: int=4, min_chunk: int=1024, stats: Optional[SearchStats]=None):
+    if np is None:
+        raise ImportError("parallel_bfs requires numpy")
+    offsets, targets = graph.csr()
+    n = graph.size
+    m = len(targets)
+    sizes = [(n + 1) * 8, max(m, 1) * 8, n, n * 8, workers * n]
+    blocks = [shared_memory.SharedMemory(create=True, size=max(size, 1)) for size in sizes]
+    try:
+        np.ndarray((n + 1,), dtype=np.int64, buffer=blocks[0].buf)[:] = offsets
+        np.ndarray((m,), dtype=np.int64, buffer=blocks[1].buf)[:] = targets
+        visited = np.ndarray((n,), dtype=np.uint8, buffer=blocks[2].buf)
+        frontier_buf = np.ndarray((n,), dtype=np.int64, buffer=blocks[3].buf)
+        next_maps = np.ndarray((workers, n), dtype=np.uint8, buffer=blocks[4].buf)
+        visited[:] = 0
+        next_maps[:] = 0
+
+        distances = np.full(n, UNREACHABLE, dtype=np.int32)
+        distances[src] = 0
+        visited[src] = 1
+        frontier = np.array([src], dtype=np.int64)
+        depth = 0
+        with Pool(workers, initializer=_attach, initargs=([block.name for block in blocks], n, m, workers)) as pool:
+            while len(frontier):
+                depth += 1
+                count = len(frontier)
+                frontier_buf[:count] = frontier
+                step = max(min_chunk, -(-count // workers))
+                tasks = [(i, lo, min(lo + step, count)) for i, lo in enumerate(range(0, count, step))]
+                scanned = sum(pool.starmap(_expand, tasks))
+                used = next_maps[:len(tasks)]
+                frontier = np.flatnonzero(np.logical_or.reduce(used, axis=0))
+                if stats is not None:
+                    stats.nodes_expanded += count
+                    stats.peak_frontier = max(stats.peak_frontier, count)
+                    stats.scan(scanned, scanned - len(frontier))
+                used[:, frontier] = 0
+                visited[frontier] = 1
+                distances[frontier] = depth
+        return distances
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
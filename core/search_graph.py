@@ -0,0 +1,203 @@
+from array import array
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from core.components import ComponentIndex
+
+
+class SearchGraph:
+    def __init__(self):
+        self.names: List[Optional[str]] = []
+        self.items: List[Any] = []
+        self.out_edges: List[Optional[Dict[int, int]]] = []
+        self.in_edges: List[Optional[Dict[int, int]]] = []
+        # Out-neighbours of every node, kept sorted by sort_key as edges and
+        # names change so a search never has to sort while expanding.
+        self.sorted_adjacent: List[Optional[array]] = []
+        self.node_count = 0
+        # Bumped by every mutation so cached results can tell they are stale.
+        self.version = 0
+        self.component_index: Optional[ComponentIndex] = None
+
+    @staticmethod
+    def for_canvas(canvas) -> "SearchGraph":
+        graph = getattr(canvas, "search_graph", None)
+        if graph is None:
+            graph = SearchGraph()
+            canvas.search_graph = graph
+        return graph
+
+    # Structural copy sharing only names and items, so a search can run over
+    # it on another thread while this graph keeps changing.
+    def snapshot(self) -> "SearchGraph":
+        graph = SearchGraph()
+        graph.names = list(self.names)
+        graph.items = list(self.items)
+        graph.out_edges = [None if edges is None else dict(edges) for edges in self.out_edges]
+        graph.in_edges = [None if edges is None else dict(edges) for edges in self.in_edges]
+        graph.sorted_adjacent = [None if adjacents is None else array("q", adjacents) for adjacents in self.sorted_adjacent]
+        graph.node_count = self.node_count
+        graph.version = self.version
+        return graph
+
+    @property
+    def size(self):
+        return len(self.names)
+
+    def __len__(self):
+        return self.node_count
+
+    def __contains__(self, node_id):
+        return 0 <= node_id < len(self.names) and self.names[node_id] is not None
+
+    def add_node(self, name: str, item: Any=None) -> int:
+        self.version += 1
+        node_id = len(self.names)
+        self.names.append(name)
+        self.items.append(item)
+        self.out_edges.append({})
+        self.in_edges.append({})
+        self.sorted_adjacent.append(array("q"))
+        self.node_count += 1
+        if self.component_index is not None:
+            self.component_index.add_node(node_id)
+        return node_id
+
+    def rename_node(self, node_id: int, name: str):
+        self.version += 1
+        self.invalidate_components()
+        for adj in self.in_edges[node_id]:
+            self._remove_sorted(adj, node_id)
+        self.names[node_id] = name
+        for adj in self.in_edges[node_id]:
+            insort(self.sorted_adjacent[adj], node_id, key=self.sort_key)
+
+    def remove_node(self, node_id: int):
+        self.version += 1
+        self.invalidate_components()
+        for adj in self.out_edges[node_id]:
+            self.in_edges[adj].pop(node_id, None)
+        for adj in self.in_edges[node_id]:
+            self.out_edges[adj].pop(node_id, None)
+            self._remove_sorted(adj, node_id)
+        self.names[node_id] = None
+        self.items[node_id] = None
+        self.out_edges[node_id] = None
+        self.in_edges[node_id] = None
+        self.sorted_adjacent[node_id] = None
+        self.node_count -= 1
+
+    def add_edge(self, node1: int, node2: int, directed=False):
+        # Self-loops never change what a search visits, so they are not stored.
+        if node1 == node2:
+            return
+        self.version += 1
+        self._link(node1, node2)
+        if not directed:
+            self._link(node2, node1)
+
+    def remove_edge(self, node1: int, node2: int, directed=False):
+        if node1 == node2:
+            return
+        self.version += 1
+        self._unlink(node1, node2)
+        if not directed:
+            self._unlink(node2, node1)
+
+    # Bulk insert for loaders: multiplicities are counted per edge but each
+    # touched row of the sorted index is rebuilt once, by sort_adjacent, at
+    # the end (or by the caller when sort is False).
+    def add_edges(self, edges: Iterable[Tuple[int, int, bool]], sort=True) -> Set[int]:
+        self.version += 1
+        touched: Set[int] = set()
+        for node1, node2, directed in edges:
+            if node1 == node2:
+                continue
+            self._count(node1, node2)
+            touched.add(node1)
+            if not directed:
+                self._count(node2, node1)
+                touched.add(node2)
+        if sort:
+            self.sort_adjacent(touched)
+        return touched
+
+    def sort_adjacent(self, node_ids: Iterable[int]):
+        for node_id in node_ids:
+            self.sorted_adjacent[node_id] = array("q", sorted(self.out_edges[node_id], key=self.sort_key))
+
+    def _link(self, src: int, dst: int):
+        if self._count(src, dst) == 1:
+            insort(self.sorted_adjacent[src], dst, key=self.sort_key)
+
+    def _count(self, src: int, dst: int) -> int:
+        out_edges = self.out_edges[src]
+        count = out_edges.get(dst, 0) + 1
+        out_edges[dst] = count
+        in_edges = self.in_edges[dst]
+        in_edges[src] = in_edges.get(src, 0) + 1
+        if count == 1 and self.component_index is not None:
+            self.component_index.link(src, dst, src in self.out_edges[dst])
+        return count
+
+    def components(self) -> ComponentIndex:
+        if self.component_index is None:
+            self.component_index = ComponentIndex(self)
+        return self.component_index
+
+    def invalidate_components(self):
+        if self.component_index is not None:
+            self.component_index.invalidate()
+
+    def _unlink(self, src: int, dst: int):
+        for edges, key in ((self.out_edges[src], dst), (self.in_edges[dst], src)):
+            count = edges.get(key, 0)
+            if count > 1:
+                edges[key] = count - 1
+            else:
+                edges.pop(key, None)
+        if dst not in self.out_edges[src]:
+            self._remove_sorted(src, dst)
+            self.invalidate_components()
+
+    def _remove_sorted(self, src: int, dst: int):
+        adjacents = self.sorted_adjacent[src]
+        i = bisect_left(adjacents, self.sort_key(dst), key=self.sort_key)
+        if i < len(adjacents) and adjacents[i] == dst:
+            del adjacents[i]
+
+    def sort_key(self, node_id: int):
+        return (self.names[node_id], node_id)
+
+    def adjacent(self, node_id: int) -> array:
+        return self.sorted_adjacent[node_id]
+
+    def has_edge(self, node1: int, node2: int) -> bool:
+        return node2 in self.out_edges[node1]
+
+    def reverse_adjacent(self, node_id: int):
+        return self.in_edges[node_id].keys()
+
+    def csr(self) -> Tuple[array, array]:
+        offsets = array("q", [0])
+        targets = array("q")
+        for adjacents in self.sorted_adjacent:
+            if adjacents is not None:
+                targets.extend(adjacents)
+            offsets.append(len(targets))
+        return (offsets, targets)
+
+    def node_ids(self) -> List[int]:
+        return sorted((i for i in range(len(self.names)) if self.names[i] is not None), key=self.sort_key)
+
+    def name(self, node_id: int) -> str:
+        return self.names[node_id]
+
+    def find(self, name: str) -> Optional[int]:
+        for node_id, node_name in enumerate(self.names):
+            if node_name == name:
+                return node_id
+        return None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.node_ids())
@@ -0,0 +1,259 @@
+from array import array
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from core.instrument import SearchStats
+
+Step = Tuple[int, int, Optional[int]]
+
+
+NO_PARENT = -1
+
+
+def bfs(graph, src: int, dst: Optional[int]=None, roots: Iterable[int]=(), parents: Optional[array]=None,
+        stats: Optional[SearchStats]=None) -> Tuple[List[int], bool]:
+    return _collect(iter_bfs(graph, src, roots, stats=stats), dst, parents)
+
+
+def dfs(graph, src: int, dst: Optional[int]=None, roots: Iterable[int]=(), parents: Optional[array]=None,
+        stats: Optional[SearchStats]=None) -> Tuple[List[int], bool]:
+    return _collect(iter_dfs(graph, src, roots, stats=stats), dst, parents)
+
+
+def _collect(steps: Iterator[Step], dst: Optional[int], parents: Optional[array]) -> Tuple[List[int], bool]:
+    order: List[int] = []
+    if parents is None:
+        for node, _, _ in steps:
+            order.append(node)
+            if node == dst:
+                return (order, True)
+        return (order, False)
+    for node, _, parent in steps:
+        order.append(node)
+        if parent is not None:
+            parents[node] = parent
+        if node == dst:
+            return (order, True)
+    return (order, False)
+
+
+def new_parents(graph) -> array:
+    return array("q", [NO_PARENT]) * graph.size
+
+
+# Walks the parent table back from dst; None when dst was not reached from src.
+def path_to(parents: array, src: int, dst: int) -> Optional[List[int]]:
+    path = [dst]
+    node = dst
+    while node != src:
+        node = parents[node]
+        if node == NO_PARENT:
+            return None
+        path.append(node)
+    path.reverse()
+    return path
+
+
+# Both generators yield (node, depth, parent) in visitation order, restarting
+# from each unseen root once a component is exhausted. A node for which
+# stop(node) is true is yielded and then the traversal ends.
+def iter_bfs(graph, src: int, roots: Iterable[int]=(), stop: Optional[Callable[[int], bool]]=None,
+             stats: Optional[SearchStats]=None) -> Iterator[Step]:
+    adjacent = graph.adjacent
+    # A node is marked when it is enqueued, which is exactly the old
+    # "in visited or in queue" test without scanning either container.
+    seen = bytearray(graph.size)
+    for root in chain((src,), roots):
+        if seen[root]:
+            continue
+        if stats is not None and root != src:
+            stats.restarts += 1
+        seen[root] = 1
+        frontier: List[int] = [root]
+        parents: List[Optional[int]] = [None]
+        depth = 0
+        while frontier:
+            next_frontier: List[int] = []
+            next_parents: List[Optional[int]] = []
+            for node, parent in zip(frontier, parents):
+                yield (node, depth, parent)
+                if stop is not None and stop(node):
+                    return
+                adjacents = adjacent(node)
+                queued = len(next_frontier)
+                for adj in adjacents:
+                    if not seen[adj]:
+                        seen[adj] = 1
+                        next_frontier.append(adj)
+                        next_parents.append(node)
+                if stats is not None:
+                    stats.expand(len(frontier))
+                    stats.scan(len(adjacents), len(adjacents) - len(next_frontier) + queued)
+            frontier = next_frontier
+            parents = next_parents
+            depth += 1
+
+
+def iter_dfs(graph, src: int, roots: Iterable[int]=(), stop: Optional[Callable[[int], bool]]=None,
+             stats: Optional[SearchStats]=None) -> Iterator[Step]:
+    adjacent = graph.adjacent
+    seen = bytearray(graph.size)
+    # One frame per level of the current DFS path; the path can never be
+    # longer than the graph, so the buffers are sized once up front.
+    stack = [0] * graph.size
+    frames: List[Optional[Sequence[int]]] = [None] * graph.size
+    positions = [0] * graph.size
+    for root in chain((src,), roots):
+        if seen[root]:
+            continue
+        if stats is not None:
+            if root != src:
+                stats.restarts += 1
+            stats.expand(1)
+        seen[root] = 1
+        yield (root, 0, None)
+        if stop is not None and stop(root):
+            return
+        top = 0
+        stack[0] = root
+        frames[0] = adjacent(root)
+        positions[0] = 0
+        while top >= 0:
+            adjacents = frames[top]
+            start = i = positions[top]
+            count = len(adjacents)
+            while i < count and seen[adjacents[i]]:
+                i += 1
+            if stats is not None:
+                stats.scan(i - start + (i < count), i - start)
+            if i == count:
+                frames[top] = None
+                top -= 1
+                continue
+            positions[top] = i + 1
+            node = adjacents[i]
+            seen[node] = 1
+            yield (node, top + 1, stack[top])
+            if stop is not None and stop(node):
+                return
+            top += 1
+            if stats is not None:
+                stats.expand(top + 1)
+            stack[top] = node
+            frames[top] = adjacent(node)
+            positions[top] = 0
+
+
+# Point-to-point BFS that grows a forward tree from src over adjacent and a
+# backward tree from dst over reverse_adjacent, always expanding one whole
+# level of the smaller frontier. Returns a shortest src -> dst path or None.
+def bidirectional_bfs(graph, src: int, dst: int, stats: Optional[SearchStats]=None) -> Optional[List[int]]:
+    if src == dst:
+        return [src]
+    frontiers = [[src], [dst]]
+    parents: List[Dict[int, Optional[int]]] = [{src: None}, {dst: None}]
+    depths: List[Dict[int, int]] = [{src: 0}, {dst: 0}]
+    expanders = [graph.adjacent, graph.reverse_adjacent]
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        expand = expanders[side]
+        own_parents = parents[side]
+        own_depths = depths[side]
+        other_depths = depths[1 - side]
+        best = None
+        next_frontier: List[int] = []
+        for node in frontiers[side]:
+            depth = own_depths[node] + 1
+            adjacents = expand(node)
+            queued = len(next_frontier)
+            for adj in adjacents:
+                if adj in other_depths and (best is None or depth + other_depths[adj] < best[0]):
+                    best = (depth + other_depths[adj], node, adj)
+                if adj not in own_parents:
+                    own_parents[adj] = node
+                    own_depths[adj] = depth
+                    next_frontier.append(adj)
+            if stats is not None:
+                stats.expand(len(frontiers[side]))
+                stats.scan(len(adjacents), len(adjacents) - len(next_frontier) + queued)
+        if best is not None:
+            _, node, adj = best
+            head, tail = (node, adj) if side == 0 else (adj, node)
+            path = list(_walk(parents[0], head))
+            path.reverse()
+            path.extend(_walk(parents[1], tail))
+            return path
+        frontiers[side] = next_frontier
+    return None
+
+
+def _walk(parents: Dict[int, Optional[int]], node: Optional[int]) -> Iterator[int]:
+    while node is not None:
+        yield node
+        node = parents[node]
+
+
+def iddfs(graph, src: int, dst: Optional[int]=None, stats: Optional[SearchStats]=None) -> Tuple[Dict[int, List[int]], bool]:
+    paths: Dict[int, List[int]] = {}
+    found = False
+    for level, depth, node in iter_iddfs(graph, src, dst, stats):
+        paths.setdefault(level, []).append(node)
+        if node == dst and depth == level:
+            found = True
+    return (paths, found)
+
+
+# Yields (level, depth, node) for every node appended to each level's path.
+# The next level only runs when some node at the depth limit still has a
+# neighbour off its path; otherwise it would repeat this level exactly.
+def iter_iddfs(graph, src: int, dst: Optional[int]=None, stats: Optional[SearchStats]=None) -> Iterator[Tuple[int, int, int]]:
+    adjacent = graph.adjacent
+    on_path = bytearray(graph.size)
+    max_depth = 0
+    while True:
+        found = False
+        frontier = 0
+        stack: List[int] = []
+        frames: List[Sequence[int]] = []
+        positions: List[int] = []
+        node = src
+        depth = 0
+        while True:
+            yield (max_depth, depth, node)
+            if node == dst and depth == max_depth:
+                found = True
+            elif depth < max_depth:
+                stack.append(node)
+                frames.append(adjacent(node))
+                positions.append(0)
+                on_path[node] = 1
+                if stats is not None:
+                    stats.expand(len(stack))
+            elif not frontier:
+                for adj in adjacent(node):
+                    if not on_path[adj]:
+                        frontier = 1
+                        break
+
+            node = -1
+            while stack:
+                adjacents = frames[-1]
+                start = i = positions[-1]
+                count = len(adjacents)
+                while i < count and on_path[adjacents[i]]:
+                    i += 1
+                if stats is not None:
+                    stats.scan(i - start + (i < count), i - start)
+                if i < count:
+                    positions[-1] = i + 1
+                    node = adjacents[i]
+                    break
+                on_path[stack.pop()] = 0
+                frames.pop()
+                positions.pop()
+            if node < 0:
+                break
+            depth = len(stack)
+        if found or not frontier:
+            return
+        max_depth += 1
@@ -1,18 +1,61 @@
 import tkinter as tk
-from tkinter import ttk
-from graphics.node_edge import Node, Edge
+from tkinter import ttk, filedialog, messagebox
+import math
+from time import perf_counter
+from graphics.node_edge import Node, Edge, FRAME_MS, NODE_FILL, BATCH_MIN, update_edges
+from graphics.shapes import np, ellipse_outlines
+from graphics.replay import Replay, reset_colours
+from graphics.spatial_index import GridIndex
+from graphics.viewport import Viewport, DETAIL, POINTS
+from core.search_graph import SearchGraph
+from core import graph_file, layout
 from typing import List, Dict
 
+# Larger files are meant for headless search through graph_file.MappedGraph.
+MAX_CANVAS_NODES = 200_000
+# Opened graphs are laid out on a circle with about this much arc per node.
+NODE_SPACING = 60
+# Screen pixels drawn beyond each edge of the view so small pans need no new items.
+RENDER_MARGIN = 50
+# Side of the screen square that all nodes in it share at the points level.
+POINT_BIN = 3
+ZOOM_STEP = 1.2
+# Replays run at REPLAY_RATE visits per second, sped up so that none takes
+# longer than MAX_REPLAY_SECONDS.
+REPLAY_RATE = 4
+MAX_REPLAY_SECONDS = 10
+# Seconds of layout work between redraws while an auto layout runs.
+LAYOUT_SLICE = 0.1
+
 class Graph(tk.Canvas):
     def __init__(self, parent, nodes, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
         self.nodes: List[Node] = nodes
+        self.search_graph = SearchGraph()
+        self.replay: Replay = None
+        self.node_index = GridIndex()
+        self.selected_nodes: List[Node] = []
+        self.selection_start = None
+        self.selection_rect = None
+        self.viewport = Viewport(self)
+        self.drawn_scale = None
+        self.drawn_origin = (0.0, 0.0)
+        self.render_job = None
+        self.pan_start = None
+        self.force_layout: layout.ForceLayout = None
+        self.layout_job = None
 
      
         self.configure(bg='#191414')
 
         self.add_node_menu = tk.Menu(self, tearoff=0)
         self.add_node_menu.add_command(label="Add Node", command=self.add_node)
+        self.add_node_menu.add_separator()
+        self.add_node_menu.add_command(label="Open Graph...", command=self.open_graph)
+        self.add_node_menu.add_command(label="Save Graph...", command=self.save_graph)
+        self.add_node_menu.add_separator()
+        self.add_node_menu.add_command(label="Auto Layout", command=self.auto_layout)
+        self.add_node_menu.add_command(label="Stop Layout", command=self.stop_layout)
         self.selected_node = None
         self.open_node_menu = False
         self.bind("<Button-3>", self.show_popup)
@@ -24,6 +67,17 @@ class Graph(tk.Canvas):
         self.node_menu.add_command(label="Delete Edge", command=self.delete_edge)
         self.node_menu.add_command(label="Delete Node", command=self.delete_node)
 
+        self.bind("<Shift-ButtonPress-1>", self.start_selection)
+        self.bind("<Shift-B1-Motion>", self.drag_selection)
+        self.bind("<Shift-ButtonRelease-1>", self.end_selection)
+
+        self.bind("<MouseWheel>", lambda event: self.zoom_view(event, ZOOM_STEP if event.delta > 0 else 1 / ZOOM_STEP))
+        self.bind("<Button-4>", lambda event: self.zoom_view(event, ZOOM_STEP))
+        self.bind("<Button-5>", lambda event: self.zoom_view(event, 1 / ZOOM_STEP))
+        self.bind("<ButtonPress-2>", self.start_pan)
+        self.bind("<B2-Motion>", self.pan_view)
+        self.bind("<Configure>", self.schedule_render)
+
     def node_menu_mode(self, node: Node):
         self.selected_node = node
         self.open_node_menu = True
@@ -44,12 +98,8 @@ class Graph(tk.Canvas):
 
     def add_node(self):
      
-        clicked_on_node = False
-        x, y = self.event.x, self.event.y
-        for node in self.nodes:
-            if node.contains(x, y):
-                clicked_on_node = True
-                break
+        x, y = self.viewport.to_world(self.event.x, self.event.y)
+        clicked_on_node = self.node_index.hit(x, y) is not None
 
         if not clicked_on_node:
            
@@ -92,18 +142,139 @@ class Graph(tk.Canvas):
     def delete_node(self):
         self.selected_node.delete()
         self.nodes.remove(self.selected_node)
+        if self.selected_node in self.selected_nodes:
+            self.selected_nodes.remove(self.selected_node)
+
+    def start_selection(self, event: tk.Event):
+        self.selection_start = (event.x, event.y)
+        self.selection_rect = self.create_rectangle(event.x, event.y, event.x, event.y, outline="white", dash=(4, 2))
+
+    def drag_selection(self, event: tk.Event):
+        if self.selection_rect is not None:
+            self.coords(self.selection_rect, *self.selection_start, event.x, event.y)
+
+    def end_selection(self, event: tk.Event):
+        if self.selection_rect is None:
+            return
+        self.delete(self.selection_rect)
+        self.selection_rect = None
+        start = self.viewport.to_world(*self.selection_start)
+        self.select_nodes(self.node_index.in_rect(*start, *self.viewport.to_world(event.x, event.y)))
+
+    def select_nodes(self, nodes: List[Node]):
+        for node in self.selected_nodes:
+            if node.shown:
+                self.itemconfigure(node.circle_cid, outline="black")
+        self.selected_nodes = nodes
+        for node in nodes:
+            if node.shown:
+                self.itemconfigure(node.circle_cid, outline="white")
+
+    def zoom_view(self, event: tk.Event, factor: float):
+        self.viewport.zoom_at(event.x, event.y, factor)
+        self.schedule_render()
+
+    def start_pan(self, event: tk.Event):
+        self.pan_start = (event.x, event.y)
+
+    def pan_view(self, event: tk.Event):
+        self.viewport.pan(event.x - self.pan_start[0], event.y - self.pan_start[1])
+        self.pan_start = (event.x, event.y)
+        self.schedule_render()
+
+    def view_size(self):
+        width, height = self.winfo_width(), self.winfo_height()
+        if width <= 1 or height <= 1:
+            return int(self["width"]), int(self["height"])
+        return width, height
+
+    def fit_view(self):
+        if not self.nodes:
+            return
+        xs = [node.center[0] for node in self.nodes]
+        ys = [node.center[1] for node in self.nodes]
+        self.viewport.fit(min(xs), min(ys), max(xs), max(ys), *self.view_size())
+        self.schedule_render()
+
+    def schedule_render(self, event=None):
+        if self.render_job is None:
+            self.render_job = self.after(FRAME_MS, self.render_view)
+
+    # Brings the canvas in line with the viewport. A pan shifts the items
+    # already drawn with one move and only creates or deletes those of nodes
+    # crossing the view's edge; a zoom redraws the view at its level of
+    # detail. Nodes are found through the spatial index, and an edge is drawn
+    # while either end is.
+    def render_view(self):
+        self.render_job = None
+        viewport = self.viewport
+        width, height = self.view_size()
+        margin = RENDER_MARGIN / viewport.zoom
+        x0, y0 = viewport.to_world(0, 0)
+        x1, y1 = viewport.to_world(width, height)
+        viewport.bounds = (x0 - margin, y0 - margin, x1 + margin, y1 + margin)
+        self.delete("points")
+        if self.drawn_scale != viewport.zoom:
+            for node in list(viewport.shown):
+                node.hide()
+                for edges in node.edges.values():
+                    for edge in edges:
+                        edge.hide()
+            self.drawn_scale = viewport.zoom
+        else:
+            x, y = viewport.to_screen(0, 0)
+            self.move("graph", x - self.drawn_origin[0], y - self.drawn_origin[1])
+        self.drawn_origin = viewport.to_screen(0, 0)
+
+        if viewport.level == POINTS:
+            self.draw_points()
+            return
+        visible = set(self.node_index.in_rect(*viewport.bounds))
+        leaving = viewport.shown - visible
+        entering = visible - viewport.shown
+        for node in leaving:
+            node.hide()
+        self.show_nodes(list(entering))
+        update_edges(list({edge for node in leaving | entering for edges in node.edges.values() for edge in edges}))
+
+    # Node.show for many nodes, with the detail outlines computed in one
+    # ellipse_outlines pass when NumPy is available.
+    def show_nodes(self, nodes: List[Node]):
+        viewport = self.viewport
+        if np is None or len(nodes) < BATCH_MIN or viewport.level != DETAIL:
+            for node in nodes:
+                node.show()
+            return
+        cx, cy, a, b, tilt = np.array([(node.center[0], node.center[1], node.circle.a, node.circle.b, node.circle.angle)
+                                       for node in nodes]).T
+        outlines = ellipse_outlines(cx, cy, a, b, tilt)
+        outlines[:, 0::2] = (outlines[:, 0::2] - viewport.x) * viewport.zoom
+        outlines[:, 1::2] = (outlines[:, 1::2] - viewport.y) * viewport.zoom
+        for node, outline in zip(nodes, outlines.tolist()):
+            node.show(outline)
+
+    # Zoomed far out, every node falling in the same POINT_BIN square of the
+    # screen is drawn as one shared point, so the item count is bounded by
+    # the screen size rather than by the graph.
+    def draw_points(self):
+        viewport = self.viewport
+        bins = set()
+        for node in self.node_index.in_rect(*viewport.bounds):
+            x, y = viewport.to_screen(*node.center)
+            bins.add((int(x) // POINT_BIN, int(y) // POINT_BIN))
+        for x, y in bins:
+            self.create_rectangle(x * POINT_BIN, y * POINT_BIN, x * POINT_BIN + 2, y * POINT_BIN + 2,
+                                  fill=NODE_FILL, outline="", tags="points")
 
     def add_edge(self):
         self.config(cursor="circle")
         self.bind("<Button-1>", self.select_end_node)
 
     def select_end_node(self, event: tk.Event):
-        x, y = event.x, event.y
-        for node in self.nodes:
-            if node.contains(x, y):
-                self.selected_end_node = node
-                self.create_edge()
-                break
+        node = self.node_index.hit(*self.viewport.to_world(event.x, event.y))
+        if node is not None:
+            self.selected_end_node = node
+            self.create_edge()
         self.config(cursor="arrow")
         self.unbind("<Button-1>")
 
@@ -171,6 +342,115 @@ class Graph(tk.Canvas):
         ttk.Button(main, text="Delete Edge", command=delete_edge, style='Spotify.TButton').pack(pady=5)  
         main.pack()
 
+    def open_graph(self):
+        path = filedialog.askopenfilename(parent=self, filetypes=[("Graph files", "*.sgr"), ("All files", "*")])
+        if not path:
+            return
+        try:
+            mapped = graph_file.MappedGraph(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Open Graph", str(e), parent=self)
+            return
+        with mapped:
+            if len(mapped) > MAX_CANVAS_NODES:
+                messagebox.showerror("Open Graph", f"{len(mapped)} nodes is too many to draw (limit {MAX_CANVAS_NODES}).", parent=self)
+                return
+            self.stop_layout()
+            self.select_nodes([])
+            for node in list(self.nodes):
+                node.delete()
+                self.nodes.remove(node)
+
+            width, height = int(self["width"]), int(self["height"])
+            radius = max(min(width, height) / 2 - 40, len(mapped) * NODE_SPACING / (2 * math.pi))
+            nodes: List[Node] = []
+            for i in range(len(mapped)):
+                angle = 2 * math.pi * i / max(len(mapped), 1)
+                node = Node(self, mapped.name(i), width / 2 + radius * math.cos(angle), height / 2 + radius * math.sin(angle))
+                self.tag_bind(node.tag, "<Button-3>", lambda event, x=node: self.node_menu_mode(x))
+                nodes.append(node)
+            # One search graph insert and one arc pass per node pair, rather
+            # than Node.add_edge redrawing every edge of a node per new edge.
+            edges = list(mapped.edges())
+            pairs = set()
+            for node1, node2, directed in edges:
+                nodes[node1].attach_edge(nodes[node2], directed)
+                if node1 != node2:
+                    pairs.add((min(node1, node2), max(node1, node2)))
+            self.search_graph.add_edges((nodes[node1].id, nodes[node2].id, directed) for node1, node2, directed in edges)
+            for node1, node2 in pairs:
+                nodes[node1].set_pt_angles(nodes[node2])
+            self.nodes.extend(nodes)
+        self.drawn_scale = None
+        self.fit_view()
+        if layout.np is not None:
+            self.auto_layout(fresh=True)
+
+    def save_graph(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".sgr", filetypes=[("Graph files", "*.sgr")])
+        if path:
+            edges = dict.fromkeys(edge for node in self.nodes for edges in node.edges.values() for edge in edges)
+            graph_file.save(self.search_graph, path, [(edge.node1.id, edge.node2.id, edge.directed) for edge in edges])
+
+    # Runs a ForceLayout for LAYOUT_SLICE seconds per frame and redraws in
+    # between, so the canvas stays responsive and Stop Layout can end it
+    # early. Nodes start where they are unless fresh.
+    def auto_layout(self, fresh=False):
+        self.stop_layout()
+        if not self.nodes:
+            return
+        if layout.np is None:
+            messagebox.showerror("Auto Layout", "Auto layout requires numpy.", parent=self)
+            return
+        self.stop_replay()
+        positions = None if fresh else {node.id: node.center for node in self.nodes}
+        self.force_layout = layout.ForceLayout(self.search_graph, positions)
+        self.layout_job = self.after(0, self.layout_tick)
+
+    def layout_tick(self):
+        started = perf_counter()
+        moving = True
+        while moving and perf_counter() - started < LAYOUT_SLICE:
+            moving = self.force_layout.step()
+        self.apply_layout(self.force_layout.positions())
+        if moving:
+            self.layout_job = self.after(FRAME_MS, self.layout_tick)
+        else:
+            self.layout_job = None
+            self.force_layout = None
+
+    def stop_layout(self):
+        if self.layout_job is not None:
+            self.after_cancel(self.layout_job)
+            self.layout_job = None
+        self.force_layout = None
+
+    def layout_tree(self, root: Node):
+        self.stop_layout()
+        self.stop_replay()
+        self.apply_layout(layout.tree_layout(self.search_graph, root.id))
+
+    # Moves every node to its new world position and redraws the view from
+    # scratch around the result.
+    def apply_layout(self, positions: Dict[int, layout.Position]):
+        for node in self.nodes:
+            position = positions.get(node.id)
+            if position is not None:
+                node.move_to(*position)
+        self.drawn_scale = None
+        self.fit_view()
+
+    def replay_search(self, order: List[Node], parents: List[Node]):
+        self.stop_replay()
+        reset_colours(self, self.nodes)
+        self.replay = Replay(self, order, parents, rate=max(REPLAY_RATE, len(order) / MAX_REPLAY_SECONDS))
+        self.replay.start()
+
+    def stop_replay(self):
+        if self.replay is not None:
+            self.replay.stop()
+            self.replay = None
+
     def generate_small_popup(self, parent, title, x, y, geometry="100x100"):
         popup = tk.Toplevel(parent)
         popup.title(title)
@@ -1,33 +1,86 @@
 import tkinter as tk
 from tkinter import ttk
 from graphics.shapes import *
+from core.search_graph import SearchGraph
+from graphics.spatial_index import GridIndex
+from graphics.viewport import Viewport, DETAIL
 
-from typing import Dict, Set
+from typing import Dict, List, Optional, Set
 import math
 
+# Motion events arriving faster than this are merged into one redraw.
+FRAME_MS = 16
+NODE_FILL = "#1DB954"
+# Fewer edges than this are cheaper to lay out one by one than through NumPy.
+BATCH_MIN = 32
+
 class Node:
     def __init__(self, canvas: tk.Canvas, name: str, x, y):
         self.canvas = canvas
         self.center = (x, y)
+        self.search_graph = SearchGraph.for_canvas(canvas)
+        self.id = self.search_graph.add_node(name, self)
+        self.drag_delta = (0, 0)
+        self.drag_job = None
+        self.node_index = GridIndex.for_canvas(canvas)
+        self.viewport = Viewport.for_canvas(canvas)
         self.draw(name)
+        self.node_index.insert(self)
 
         self.edges: Dict[Node, Set[Edge]] = {}
 
     def draw(self, name: str):
         self.tag = "_" + name
-        self.label = self.canvas.create_text(self.center, text=name, font=("Arial", 20), tags=self.tag)
-        bbox = self.canvas.bbox(self.label)
-        height = bbox[3] - bbox[1]
-        width = max(bbox[2] - bbox[0], height)
+        self.label = None
+        self.circle_cid = None
+        self.viewport.shown.discard(self)
+        width, height = self.viewport.label_size(name)
+        width = max(width, height)
         self.circle = EllipseBuilder()\
                 .set_center(self.center)\
                 .set_a(width / (2**0.5))\
                 .set_b(height / (2**0.5)).build()
-        self.circle_cid = self.circle.draw(self.canvas, tag=self.tag, fill="#1DB954", outline="black", width=2) 
-        self.canvas.tag_raise(self.label)
-
+        # Bindings belong to the tag, not to items, so they outlive every
+        # hide and show; binding per show would leak a Tcl command each time.
         self.canvas.tag_bind(self.tag, "<ButtonPress-1>", self.on_press)
         self.canvas.tag_bind(self.tag, "<B1-Motion>", self.on_drag)
+        if self.viewport.visible(*self.center):
+            self.show()
+
+    @property
+    def shown(self) -> bool:
+        return self.circle_cid is not None
+
+    # Creates the node's canvas items for the viewport's current zoom: the
+    # smoothed outline and a label in detail, a plain oval below that.
+    def show(self, outline: Optional[List[float]]=None):
+        if self.circle_cid is not None:
+            return
+        viewport = self.viewport
+        tags = (self.tag, "graph")
+        if viewport.level == DETAIL:
+            if outline is None:
+                outline = viewport.project(self.circle.outline_coords())
+            self.circle_cid = self.canvas.create_polygon(outline, smooth=True,
+                                                         tags=tags, fill=NODE_FILL, outline="black", width=2)
+            self.label = self.canvas.create_text(viewport.to_screen(*self.center), text=self.tag[1:],
+                                                 font=("Arial", max(1, round(20 * viewport.zoom))), tags=tags)
+        else:
+            x, y = viewport.to_screen(*self.center)
+            a = self.circle.a * viewport.zoom
+            b = self.circle.b * viewport.zoom
+            self.circle_cid = self.canvas.create_oval(x - a, y - b, x + a, y + b, tags=tags, fill=NODE_FILL, outline="black")
+        viewport.shown.add(self)
+
+    def hide(self):
+        if self.circle_cid is not None:
+            # By id: deleting by tag makes Tk scan every item on the canvas.
+            self.canvas.delete(self.circle_cid)
+            if self.label is not None:
+                self.canvas.delete(self.label)
+            self.label = None
+            self.circle_cid = None
+        self.viewport.shown.discard(self)
 
     def on_press(self, event: tk.Event):
         self.move_pt = Point(event.x, event.y)
@@ -37,15 +90,36 @@ class Node:
         dy = event.y - self.move_pt.y
         self.move_pt.x = event.x
         self.move_pt.y = event.y
-        self.canvas.move(self.tag, dx, dy)
+        self.drag_delta = (self.drag_delta[0] + dx, self.drag_delta[1] + dy)
+        if self.drag_job is None:
+            self.drag_job = self.canvas.after(FRAME_MS, self.flush_drag)
+
+    def flush_drag(self):
+        self.drag_job = None
+        dx, dy = self.drag_delta
+        self.drag_delta = (0, 0)
+        if self.shown:
+            self.canvas.move(self.tag, dx, dy)
+            self.canvas.tag_raise(self.tag)
+        dx /= self.viewport.zoom
+        dy /= self.viewport.zoom
         self.circle.update_center(dx, dy)  
-        self.canvas.tag_raise(self.tag)
         self.center = (self.center[0] + dx, self.center[1] + dy)
+        self.node_index.move(self)
         self.draw_edges()
 
+    # Moves the node in world coordinates without touching its canvas items;
+    # the caller redraws, as Graph.apply_layout does once for all nodes.
+    def move_to(self, x, y):
+        self.circle.update_center(x - self.center[0], y - self.center[1])
+        self.center = (x, y)
+        self.node_index.move(self)
+
     def rename(self, new_name: str, callback=None):
         self.canvas.delete(self.tag)
+        self.search_graph.rename_node(self.id, new_name)
         self.draw(new_name)
+        self.node_index.move(self)
         self.draw_edges()
         if callback is not None:
             callback()
@@ -55,14 +129,26 @@ class Node:
         return self.circle.contains(x, y)
 
     def delete(self):
-        self.canvas.delete(self.tag)
-        self.canvas.delete(self.circle_cid)
+        if self.drag_job is not None:
+            self.canvas.after_cancel(self.drag_job)
+            self.drag_job = None
+        self.hide()
+        self.node_index.remove(self)
         for node, edge_list in self.edges.items():
             for edge in edge_list:
-                self.canvas.delete(edge.cid)
+                edge.hide()
             node.edges.pop(self)
+        self.search_graph.remove_node(self.id)
 
     def add_edge(self, node, directed=False):
+        edge = self.attach_edge(node, directed)
+        self.search_graph.add_edge(self.id, node.id, directed)
+        if edge.type != LOOP:
+            self.update_pt_angles(node)
+
+    # Creates the Edge and files it under both ends, leaving the search graph
+    # and the drawing alone so bulk loads can update those once at the end.
+    def attach_edge(self, node, directed=False) -> "Edge":
         edges = self.edges.get(node)
         if edges is None:
             edges = set()
@@ -70,19 +156,21 @@ class Node:
             node.edges[self] = edges
         edge = Edge(self.canvas, self, node, directed)
         edges.add(edge)
-        if edge.type != LOOP:
-            self.update_pt_angles(node)
+        return edge
 
     def draw_edges(self):
-        for edges in self.edges.values():
-            for edge in edges:
-                edge.draw()
+        update_edges([edge for edges in self.edges.values() for edge in edges])
 
-    def update_pt_angles(self, node):  # TODO: 
-        edges: Set[Edge] = self.edges.get(node)
-        if edges is None:
+    def update_pt_angles(self, node):
+        if self.edges.get(node) is None:
             return
+        self.set_pt_angles(node)
+        self.draw_edges()
 
+    # Fans the edges between this node and node out as arcs on either side
+    # of the straight line, in pi/6 steps.
+    def set_pt_angles(self, node):  # TODO: 
+        edges: Set[Edge] = self.edges[node]
         count = len(edges)
         if count == 1:
             e = edges.pop()
@@ -100,7 +188,6 @@ class Node:
                 e1.set_pt_angle(angle if e1.is_node1(self) else -angle)
                 e2.set_pt_angle(-angle if e2.is_node1(self) else angle)
                 angle += math.pi/6
-        self.draw_edges()
 
     def delete_edge(self, edge):
         edge.is_node1(self) 
@@ -115,27 +202,19 @@ class Node:
         return set()
 
     def get_adjacent_nodes(self):
-        adjacents = set()
-        for node, edges in self.edges.items():
-            for edge in edges:
-                if edge.directed:
-                    if edge.is_node1(self):
-                        adjacents.add(node)
-                        break
-                else:
-                    adjacents.add(node)
-                    break
-        return adjacents
+        items = self.search_graph.items
+        return {items[node_id] for node_id in self.search_graph.adjacent(self.id)}
 
     def __repr__(self):
         return f"Node({self.tag})"
 
+    # A Node is the single object registered for its id in search_graph, so
+    # identity is equality and the id (stable across renames) is the hash.
     def __eq__(self, other):
-        assert isinstance(other, Node)
-        return self.tag == other.tag
+        return self is other
 
     def __hash__(self):
-        return hash(self.tag)
+        return self.id
 
 
 LINE = 0
@@ -156,29 +235,59 @@ class Edge:
         if angle != 0 and angle != math.pi:
             self.type = ARC
 
-    def draw(self, fill="black", width=2):
+    @property
+    def shown(self) -> bool:
+        return self.node1.shown or self.node2.shown
+
+    def draw(self, fill="black", width=2, coords: Optional[List[float]]=None):
+        self.hide()
+        if coords is None:
+            coords = self.coords()
+        if coords is None or not self.shown:
+            return
+        viewport = self.node1.viewport
+        arrow = tk.LAST if self.directed else None
+        self.cid = self.canvas.create_line(viewport.project(coords), width=width, smooth=viewport.level == DETAIL,
+                                           fill=fill, arrow=arrow, tags="graph")
+
+    # Moves the existing canvas item to the current geometry, keeping its
+    # stacking order and colours; only a missing item is created, and the
+    # item is dropped once neither end is on screen.
+    def update(self, coords: Optional[List[float]]=None):
+        if not self.shown:
+            self.hide()
+            return
+        if self.cid is None:
+            self.draw(coords=coords)
+            return
+        if coords is None:
+            coords = self.coords()
+        if coords is not None:
+            self.canvas.coords(self.cid, self.node1.viewport.project(coords))
+
+    def hide(self):
         if self.cid is not None:
             self.canvas.delete(self.cid)
-        canvas = self.canvas
-        line: Line = LineBuilder()\
-                .set_start_point(self.node1.center)\
-                .set_end_point(self.node2.center).build()
-        angle = line.get_angle()
-        start_pt = self.node1.circle.get_point_from_angle(angle + self.pt_angle)
-        end_pt = self.node2.circle.get_point_from_angle(angle + math.pi - self.pt_angle)
+            self.cid = None
 
-        arrow = tk.LAST if self.directed else None
+    # Flat [x0, y0, (xm, ym,) x1, y1] list for the line item, computed from
+    # the node centres without building intermediate shapes; None for loops.
+    def coords(self) -> Optional[List[float]]:
+        (x1, y1), (x2, y2) = self.node1.center, self.node2.center
+        angle = math.atan2(y1 - y2, x2 - x1)
+        start_x, start_y = self.node1.circle.point_at(angle + self.pt_angle)
+        end_x, end_y = self.node2.circle.point_at(angle + math.pi - self.pt_angle)
 
         if self.type == LINE:
-            self.cid = Line(start_pt, end_pt).draw_line(canvas, fill=fill, width=width, arrow=arrow)
+            return [start_x, start_y, end_x, end_y]
         elif self.type == ARC:
-            center = line.get_midpoint()
             b = (50 if self.pt_angle > 0 else -50) * abs(self.pt_angle/(math.pi/6))
-            mid_pt = LineBuilder()\
-                    .from_radians_and_length(center, line.get_perpendicular_angle(), b).end
-            self.cid = Line(start_pt, end_pt, other_points=[mid_pt]).draw_line(canvas, arrow=arrow, fill=fill, width=width)
+            perpendicular = angle + math.pi / 2
+            mid_x = (x1 + x2) / 2 + b * math.cos(perpendicular)
+            mid_y = (y1 + y2) / 2 - b * math.sin(perpendicular)
+            return [start_x, start_y, mid_x, mid_y, end_x, end_y]
         elif self.type == LOOP:
-            pass  # TODO: 
+            return None  # TODO: 
         else:
             raise ValueError("Invalid edge type")
 
@@ -195,6 +304,7 @@ class Edge:
         if self.cid is not None:
             self.canvas.delete(self.cid)
         self.node1.edges[self.node2].remove(self)
+        self.node1.search_graph.remove_edge(self.node1.id, self.node2.id, self.directed)
         self.node1.update_pt_angles(self.node2)
         self.node2.update_pt_angles(self.node1)
 
@@ -207,6 +317,25 @@ class Edge:
 
 
 
+# Edge.update for many edges, with the geometry of those on screen computed
+# in one edge_points pass when NumPy is available.
+def update_edges(edges: List[Edge]):
+    shown = [edge for edge in edges if edge.shown and edge.type != LOOP]
+    if np is None or len(shown) < BATCH_MIN:
+        for edge in edges:
+            edge.update()
+        return
+    for edge in edges:
+        if not edge.shown:
+            edge.hide()
+    columns = np.array([(edge.node1.center[0], edge.node1.center[1], edge.node1.circle.a, edge.node1.circle.b, edge.node1.circle.angle,
+                         edge.node2.center[0], edge.node2.center[1], edge.node2.circle.a, edge.node2.circle.b, edge.node2.circle.angle,
+                         edge.pt_angle) for edge in shown]).T
+    points = edge_points(columns[0], columns[1], columns[2:5], columns[5], columns[6], columns[7:10], columns[10]).tolist()
+    for edge, row in zip(shown, points):
+        edge.update(row if edge.type == ARC else [row[0], row[1], row[4], row[5]])
+
+
 if __name__ == "__main__":
     root = tk.Tk()
     root.title("Graph Search")
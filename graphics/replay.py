@@ -0,0 +1,83 @@
+from time import perf_counter
+from typing import Dict, List, Optional
+
+from graphics.node_edge import Node, Edge, NODE_FILL
+
+VISITED_FILL = "#2D46B9"
+CURRENT_FILL = "#F037A5"
+EDGE_FILL = "black"
+TREE_EDGE_FILL = "#F037A5"
+
+
+# Replays a search's visitation order on the canvas. Visits come due at
+# `rate` per second but are only drawn on frame ticks: each tick applies
+# every visit that came due since the last one as a single batch, keeping
+# just the final options for each canvas item. When visits outpace the frame
+# rate, or a tick runs late, the in-between frames are skipped rather than
+# queued as one Tk call per visit.
+class Replay:
+    def __init__(self, canvas, order: List[Node], parents: List[Optional[Node]], rate: float=10, fps: int=30):
+        self.canvas = canvas
+        self.order = order
+        self.parents = parents
+        self.rate = rate
+        self.frame_ms = max(1, round(1000 / fps))
+        self.shown = 0
+        self.current: Optional[Node] = None
+        self.started = 0.0
+        self.job = None
+
+    @property
+    def running(self) -> bool:
+        return self.job is not None
+
+    def start(self):
+        self.started = perf_counter()
+        self.tick()
+
+    def stop(self):
+        if self.job is not None:
+            self.canvas.after_cancel(self.job)
+            self.job = None
+
+    def tick(self):
+        due = min(len(self.order), int((perf_counter() - self.started) * self.rate) + 1)
+        updates: Dict[int, dict] = {}
+        for i in range(self.shown, due):
+            node = self.order[i]
+            if self.current is not None:
+                updates[self.current.circle_cid] = {"fill": VISITED_FILL}
+            updates[node.circle_cid] = {"fill": CURRENT_FILL}
+            self.current = node
+            edge = tree_edge(self.parents[i], node)
+            if edge is not None and edge.cid is not None:
+                updates[edge.cid] = {"fill": TREE_EDGE_FILL, "width": 3}
+        self.shown = due
+        if due == len(self.order) and self.current is not None:
+            updates[self.current.circle_cid] = {"fill": VISITED_FILL}
+        # Nodes culled from the view have no items (circle_cid is None).
+        updates.pop(None, None)
+        for cid, options in updates.items():
+            self.canvas.itemconfigure(cid, **options)
+        self.job = self.canvas.after(self.frame_ms, self.tick) if due < len(self.order) else None
+
+
+# The edge a search followed from parent to node: an undirected one or one
+# directed parent -> node.
+def tree_edge(parent: Optional[Node], node: Node) -> Optional[Edge]:
+    if parent is None:
+        return None
+    for edge in parent.edges.get(node, ()):
+        if not edge.directed or edge.node1 is parent:
+            return edge
+    return None
+
+
+def reset_colours(canvas, nodes: List[Node]):
+    for node in nodes:
+        if node.circle_cid is not None:
+            canvas.itemconfigure(node.circle_cid, fill=NODE_FILL)
+        for edges in node.edges.values():
+            for edge in edges:
+                if edge.cid is not None:
+                    canvas.itemconfigure(edge.cid, fill=EDGE_FILL, width=2)
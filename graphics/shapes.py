@@ -2,6 +2,17 @@ import tkinter as tk
 import math
 from typing import List, Union, Tuple
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Unit circle sampled every 15 degrees; every ellipse outline is these points
+# scaled by (a, b), tilted and moved to the centre.
+OUTLINE_STEPS = 24
+UNIT_COS = tuple(math.cos(math.radians(i * 360 / OUTLINE_STEPS)) for i in range(OUTLINE_STEPS))
+UNIT_SIN = tuple(math.sin(math.radians(i * 360 / OUTLINE_STEPS)) for i in range(OUTLINE_STEPS))
+
 class Point:
     def __init__(self, x, y):
         self.x = x
@@ -117,19 +128,27 @@ class Ellipse:
         self.a = a
         self.b = b
         self.angle = angle
+        self.tilt_cache = None
 
     def __repr__(self):
         return f"Ellipse({self.center}, {self.a}, {self.b})"
 
+    def tilt(self) -> Tuple[float, float]:
+        if self.tilt_cache is None or self.tilt_cache[0] != self.angle:
+            self.tilt_cache = (self.angle, math.cos(self.angle), math.sin(self.angle))
+        return self.tilt_cache[1:]
+
     def draw(self, canvas: tk.Canvas, **kwargs):
-        points: List[Point] = []
-        for i in range(0, 360, 15):
-            angle = math.radians(i)
-            x = self.center.x + self.a * math.cos(angle) * math.cos(self.angle) - self.b * math.sin(angle) * math.sin(self.angle)
-            y = self.center.y - self.b * math.sin(angle) * math.cos(self.angle) - self.a * math.cos(angle) * math.sin(self.angle)
-            points.append(Point(x, y))
+        return canvas.create_polygon(self.outline_coords(), smooth=True, **kwargs)
 
-        return canvas.create_polygon([point.get_coords() for point in points], smooth=True, **kwargs)
+    def outline_coords(self) -> List[float]:
+        cos_tilt, sin_tilt = self.tilt()
+        x, y, a, b = self.center.x, self.center.y, self.a, self.b
+        coords: List[float] = []
+        for cos, sin in zip(UNIT_COS, UNIT_SIN):
+            coords.append(x + a * cos * cos_tilt - b * sin * sin_tilt)
+            coords.append(y - b * sin * cos_tilt - a * cos * sin_tilt)
+        return coords
 
     def update_center(self, dx, dy):
         self.center.x += dx
@@ -139,9 +158,14 @@ class Ellipse:
         return ((x - self.center.x) ** 2) / (self.a ** 2) + ((y - self.center.y) ** 2) / (self.b ** 2) <= 1
 
     def get_point_from_angle(self, angle): 
-        x = self.center.x + self.a * math.cos(angle) * math.cos(self.angle) - self.b * math.sin(angle) * math.sin(self.angle)
-        y = self.center.y - self.b * math.sin(angle) * math.cos(self.angle) - self.a * math.cos(angle) * math.sin(self.angle)
-        return Point(x, y)
+        return Point(*self.point_at(angle))
+
+    def point_at(self, angle) -> Tuple[float, float]:
+        cos, sin = math.cos(angle), math.sin(angle)
+        cos_tilt, sin_tilt = self.tilt()
+        x = self.center.x + self.a * cos * cos_tilt - self.b * sin * sin_tilt
+        y = self.center.y - self.b * sin * cos_tilt - self.a * cos * sin_tilt
+        return (x, y)
 
     def draw_major_axis(self, canvas: tk.Canvas, color="black", **kwargs):
         angle = self.angle
@@ -203,3 +227,40 @@ class EllipseBuilder:
         if any([self.center is None, self.a is None, self.b is None]):
             raise ValueError("Center, a, b, and angle must be set.")
         return Ellipse(self.center, self.a, self.b, self.angle)
+
+
+# Batched forms of Ellipse.outline_coords, Ellipse.point_at and Edge.coords
+# over parallel NumPy arrays, one row per ellipse or edge, for redrawing many
+# items at once. They need NumPy; callers fall back to the per-object methods.
+def ellipse_outlines(cx, cy, a, b, tilt) -> "np.ndarray":
+    cos_tilt = np.cos(tilt)[:, None]
+    sin_tilt = np.sin(tilt)[:, None]
+    unit_cos = np.array(UNIT_COS)
+    unit_sin = np.array(UNIT_SIN)
+    a = np.asarray(a)[:, None]
+    b = np.asarray(b)[:, None]
+    outlines = np.empty((len(cx), 2 * OUTLINE_STEPS))
+    outlines[:, 0::2] = np.asarray(cx)[:, None] + a * unit_cos * cos_tilt - b * unit_sin * sin_tilt
+    outlines[:, 1::2] = np.asarray(cy)[:, None] - b * unit_sin * cos_tilt - a * unit_cos * sin_tilt
+    return outlines
+
+
+def ellipse_points(cx, cy, a, b, tilt, angle) -> Tuple["np.ndarray", "np.ndarray"]:
+    cos, sin = np.cos(angle), np.sin(angle)
+    cos_tilt, sin_tilt = np.cos(tilt), np.sin(tilt)
+    return (cx + a * cos * cos_tilt - b * sin * sin_tilt,
+            cy - b * sin * cos_tilt - a * cos * sin_tilt)
+
+
+# Rows of [start x, start y, control x, control y, end x, end y]; the control
+# point is the arc's bulge and is only meaningful where pt_angle != 0.
+def edge_points(x1, y1, ellipse1, x2, y2, ellipse2, pt_angle) -> "np.ndarray":
+    angle = np.arctan2(y1 - y2, x2 - x1)
+    points = np.empty((len(angle), 6))
+    points[:, 0], points[:, 1] = ellipse_points(x1, y1, *ellipse1, angle + pt_angle)
+    points[:, 4], points[:, 5] = ellipse_points(x2, y2, *ellipse2, angle + math.pi - pt_angle)
+    bulge = np.where(pt_angle > 0, 50, -50) * np.abs(pt_angle / (math.pi / 6))
+    perpendicular = angle + math.pi / 2
+    points[:, 2] = (x1 + x2) / 2 + bulge * np.cos(perpendicular)
+    points[:, 3] = (y1 + y2) / 2 - bulge * np.sin(perpendicular)
+    return points
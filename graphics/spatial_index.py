@@ -0,0 +1,77 @@
+import math
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+Cell = Tuple[int, int]
+
+
+# Uniform grid over node ellipses. Each node is filed under every cell its
+# bounding box touches, so a point query only tests the few nodes sharing one
+# cell and a rectangle query only visits the cells it covers.
+class GridIndex:
+    def __init__(self, cell_size: float=64):
+        self.cell_size = cell_size
+        self.cells: Dict[Cell, Set[Any]] = {}
+        self.node_cells: Dict[Any, List[Cell]] = {}
+
+    @staticmethod
+    def for_canvas(canvas) -> "GridIndex":
+        index = getattr(canvas, "node_index", None)
+        if index is None:
+            index = GridIndex()
+            canvas.node_index = index
+        return index
+
+    def __len__(self):
+        return len(self.node_cells)
+
+    def cells_in(self, x0, y0, x1, y1) -> List[Cell]:
+        size = self.cell_size
+        return [(i, j)
+                for i in range(math.floor(x0 / size), math.floor(x1 / size) + 1)
+                for j in range(math.floor(y0 / size), math.floor(y1 / size) + 1)]
+
+    def cells_of(self, node) -> List[Cell]:
+        circle = node.circle
+        r = max(circle.a, circle.b)
+        return self.cells_in(circle.center.x - r, circle.center.y - r, circle.center.x + r, circle.center.y + r)
+
+    def insert(self, node):
+        cells = self.cells_of(node)
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(node)
+        self.node_cells[node] = cells
+
+    def remove(self, node):
+        for cell in self.node_cells.pop(node, ()):
+            nodes = self.cells[cell]
+            nodes.discard(node)
+            if not nodes:
+                del self.cells[cell]
+
+    def move(self, node):
+        if self.node_cells.get(node) != self.cells_of(node):
+            self.remove(node)
+            self.insert(node)
+
+    # The node whose ellipse contains (x, y), preferring the oldest one where
+    # ellipses overlap, as the old scan over Graph.nodes did.
+    def hit(self, x, y) -> Optional[Any]:
+        size = self.cell_size
+        hits = [node for node in self.cells.get((math.floor(x / size), math.floor(y / size)), ())
+                if node.contains(x, y)]
+        return min(hits, key=lambda node: node.id) if hits else None
+
+    # Nodes whose centre lies in the rectangle, in creation order.
+    def in_rect(self, x0, y0, x1, y1) -> List[Any]:
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        size = self.cell_size
+        cell_count = (math.floor(x1 / size) - math.floor(x0 / size) + 1) * (math.floor(y1 / size) - math.floor(y0 / size) + 1)
+        cells: Iterable[Cell] = self.cells if cell_count > len(self.cells) else self.cells_in(x0, y0, x1, y1)
+        found = set()
+        for cell in cells:
+            for node in self.cells.get(cell, ()):
+                center = node.circle.center
+                if x0 <= center.x <= x1 and y0 <= center.y <= y1:
+                    found.add(node)
+        return sorted(found, key=lambda node: node.id)
@@ -0,0 +1,85 @@
+import tkinter.font as tkfont
+from typing import List, Optional, Set, Tuple
+
+DETAIL = "detail"
+SIMPLE = "simple"
+POINTS = "points"
+
+# Below DETAIL_ZOOM nodes lose their labels and smoothing; below SIMPLE_ZOOM
+# they are binned into single points and edges are not drawn at all.
+DETAIL_ZOOM = 0.5
+SIMPLE_ZOOM = 0.1
+MIN_ZOOM = 1e-5
+MAX_ZOOM = 8.0
+
+
+# Maps world coordinates, which Node.center, the ellipses and the spatial
+# index all use, to canvas pixels: screen = (world - origin) * zoom. bounds is
+# the world rectangle currently worth drawing; None means everything, as on a
+# plain canvas that never zooms or culls.
+class Viewport:
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.zoom = 1.0
+        self.x = 0.0
+        self.y = 0.0
+        self.bounds: Optional[Tuple[float, float, float, float]] = None
+        self.shown: Set = set()
+        self.font = None
+
+    @staticmethod
+    def for_canvas(canvas) -> "Viewport":
+        viewport = getattr(canvas, "viewport", None)
+        if viewport is None:
+            viewport = Viewport(canvas)
+            canvas.viewport = viewport
+        return viewport
+
+    @property
+    def level(self) -> str:
+        if self.zoom >= DETAIL_ZOOM:
+            return DETAIL
+        return SIMPLE if self.zoom >= SIMPLE_ZOOM else POINTS
+
+    def to_screen(self, x, y) -> Tuple[float, float]:
+        return ((x - self.x) * self.zoom, (y - self.y) * self.zoom)
+
+    def to_world(self, x, y) -> Tuple[float, float]:
+        return (x / self.zoom + self.x, y / self.zoom + self.y)
+
+    def project(self, coords: List[float]) -> List[float]:
+        zoom = self.zoom
+        projected = list(coords)
+        projected[0::2] = [(x - self.x) * zoom for x in coords[0::2]]
+        projected[1::2] = [(y - self.y) * zoom for y in coords[1::2]]
+        return projected
+
+    def visible(self, x, y) -> bool:
+        if self.bounds is None:
+            return True
+        x0, y0, x1, y1 = self.bounds
+        return x0 <= x <= x1 and y0 <= y <= y1
+
+    # Keeps the world point under (sx, sy) fixed on screen.
+    def zoom_at(self, sx, sy, factor):
+        x, y = self.to_world(sx, sy)
+        self.zoom = min(MAX_ZOOM, max(MIN_ZOOM, self.zoom * factor))
+        self.x = x - sx / self.zoom
+        self.y = y - sy / self.zoom
+
+    def pan(self, dx, dy):
+        self.x -= dx / self.zoom
+        self.y -= dy / self.zoom
+
+    def fit(self, x0, y0, x1, y1, width, height, margin=40):
+        self.zoom = min(1.0, (width - 2 * margin) / max(x1 - x0, 1), (height - 2 * margin) / max(y1 - y0, 1))
+        self.zoom = max(MIN_ZOOM, self.zoom)
+        self.x = (x0 + x1) / 2 - width / 2 / self.zoom
+        self.y = (y0 + y1) / 2 - height / 2 / self.zoom
+
+    # Size of a node label at zoom 1, measured without creating a text item
+    # so nodes outside the view cost no canvas calls.
+    def label_size(self, name: str) -> Tuple[int, int]:
+        if self.font is None:
+            self.font = tkfont.Font(root=self.canvas, family="Arial", size=20)
+        return (self.font.measure(name), self.font.metrics("linespace"))
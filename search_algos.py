@@ -1,113 +1,261 @@
 from graphics.node_edge import Node, Edge
-from collections import deque
-from typing import List, Optional, Deque, Dict
+from core.search_graph import SearchGraph
+from core.graph_file import MappedGraph
+from core.cache import SearchCache
+from core.instrument import SearchStats, timed
+from core import traversal, hop_distance, parallel_bfs, direction_bfs
+from array import array
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
+
+NodeRef = Union[Node, int]
 
 class location:
     def __init__(self):
         self.graph: List[Node] = None
+        self.core: SearchGraph = None
+        self.roots: Optional[List[int]] = None
+        self.search_tree: Optional[Tuple[str, SearchGraph, int, int, array]] = None
+        self.cache: Optional[SearchCache] = SearchCache()
+        # The graph cache keys name in place of core; a snapshot names the
+        # graph it was copied from, so it shares that graph's entries.
+        self.cache_graph: Optional[SearchGraph] = None
+        # With instrument set, every search leaves its counters and phase
+        # timings in stats; otherwise stats stays None and engines skip them.
+        self.instrument = False
+        self.stats: Optional[SearchStats] = None
 
-    def set_graph(self, graph: List[Node]):
-        self.graph = sorted(graph, key=lambda node: node.tag[1:])
-
-    def dfs(self, src: Node, dst: Optional[Node]=None, visited: Optional[List[Node]]=None):
-        if visited is None:
-            visited = []
-        found = self.dfs_util(src, visited, dst)
-        if not found:
-            unvisited = sorted([node for node in self.graph if node not in visited], key=lambda node: node.tag[1:])
-            if unvisited:
-                return self.dfs(unvisited[0], dst, visited)
-        return (visited, found)
-
-    def dfs_util(self, node: Node, visited: List[Node], dst: Optional[Node]):
-        visited.append(node)
-        if dst is not None and node == dst:
-            return True
+    def set_graph(self, graph: Union[List[Node], SearchGraph, MappedGraph]):
+        if isinstance(graph, (SearchGraph, MappedGraph)):
+            self.graph = None
+            self.core = graph
+            self.roots = None
+        else:
+            self.graph = sorted(graph, key=lambda node: node.tag[1:])
+            self.core = self.graph[0].search_graph if self.graph else None
+            self.roots = [node.id for node in self.graph]
+        if self.cache is not None:
+            self.cache.clear()
+
+    def resolve(self, src: NodeRef):
+        if isinstance(src, Node):
+            return src.search_graph, src.search_graph.items.__getitem__
+        return self.core, int
 
-        adjacents = sorted(node.get_adjacent_nodes(), key=lambda node: node.tag[1:])
-        for adj in adjacents:
-            if adj not in visited and adj != node:
-                if self.dfs_util(adj, visited, dst):
-                    return True
-
-        return False
-
-    def bfs(self, src: Node, dst: Optional[Node]=None, visited: Optional[List[Node]]=None):
-        if visited is None:
-            visited = []
-        found = False
-        queue = deque([src])
-        while queue:
-            node = queue.popleft()
-            if node == dst:
-                found = True
-                visited.append(node)
-                break
-            adjacents = sorted(node.get_adjacent_nodes(), key=lambda node: node.tag[1:])
-            for adj in adjacents:
-                if not (adj in visited or adj in queue) and adj != node:
-                    queue.append(adj)
-            visited.append(node)
-        if not found:
-            unvisited = sorted([node for node in self.graph if node not in visited], key=lambda node: node.tag[1:])
-            return self.bfs(unvisited[0], dst, visited)
-        return (visited, found)
-
-    def iddfs(self, src: Node, dst: Node):
-        max_depth = 0
-        paths: Dict[int, List[Node]] = {}
-        found = [False]
-        while True:
-            natural_failure = [True]
-            path = deque([src])
-            self.iddfs_util(max_depth, path, dst, natural_failure, found)
-  
-            if max_depth != 0 and path == paths[max_depth-1]:
-                break
-            paths[max_depth] = path
-            max_depth += 1
-            if natural_failure[0] or found[0]:
-                break
-        return (paths, found[0])
-
-    def iddfs_util(self, max_depth: int, path: Deque[Node], dst: Optional[Node], natural_failure: List[bool], found, prev_nodes: deque[Node]=None):
-        if prev_nodes is None:
-            prev_nodes = deque([])
-        node = path[-1]
-        if dst is not None:
-            if node == dst and max_depth == 0:
-                found[0] = True
+    def new_stats(self, engine: str) -> Optional[SearchStats]:
+        self.stats = SearchStats(engine) if self.instrument else None
+        return self.stats
+
+    # A detached searcher over a snapshot of src's graph with the same restart
+    # roots and result cache, for running a search off the UI thread.
+    def snapshot(self, src: NodeRef) -> "location":
+        core, _ = self.resolve(src)
+        searcher = location()
+        searcher.set_graph(core.snapshot())
+        searcher.roots = None if self.roots is None else list(self.roots)
+        searcher.cache = self.cache
+        searcher.cache_graph = core if self.cache_graph is None else self.cache_graph
+        searcher.instrument = self.instrument
+        return searcher
+
+    # Restart roots in sort_key order, produced lazily: the engines only pull
+    # from them once src's component is exhausted, so a search that ends
+    # there never builds the component index or sorts the node ids.
+    def restart_ids(self, core: SearchGraph, stats: Optional[SearchStats]) -> Iterator[int]:
+        if self.roots is None:
+            components = core.components()
+            # With no one-way edges every restart lands on a new component's
+            # smallest node, so the component roots are the whole sequence.
+            if components.symmetric:
+                if stats is not None and (components.sorted_roots is None or components.sorted_version != core.version):
+                    stats.sort_calls += 1
+                yield from components.roots()
                 return
+            if stats is not None:
+                stats.sort_calls += 1
+            yield from core.node_ids()
+            return
+        if stats is not None:
+            stats.sort_calls += 1
+        yield from sorted((node_id for node_id in self.roots if node_id in core), key=core.sort_key)
 
-        if max_depth > 0:
-            nodes = sorted(node.get_adjacent_nodes(), key=lambda node: node.tag[1:])
-            prev_nodes.append(node)
-            for adj in nodes:
-                if adj != node and adj not in prev_nodes:
-                    path.append(adj)
-                    self.iddfs_util(max_depth-1, path, dst, natural_failure, found, prev_nodes)
-            prev_nodes.pop()
-        elif node.get_adjacent_nodes():
-            natural_failure[0] = False
+    @staticmethod
+    def node_id(node: Optional[NodeRef]):
+        return node.id if isinstance(node, Node) else node
 
+    # Results are cached per (search, src, dst) and the graph's version, so
+    # a repeat on an unchanged graph skips the traversal entirely.
+    def cached(self, name: str, src: NodeRef, dst: Optional[NodeRef], compute: Callable[[], Any]):
+        if self.cache is None:
+            return compute()
+        hits = self.cache.hits
+        core, _ = self.resolve(src)
+        result = self.cache.get_or_compute(self.cache_key(name, core, src, dst), compute)
+        if self.stats is not None:
+            self.stats.cache_hit = self.cache.hits > hits
+        return result
 
+    # The cached result of a search by ids over core, as a snapshot of core
+    # would key it, or None without running anything; the UI checks this on
+    # the live graph before paying for a snapshot.
+    def lookup(self, name: str, core: SearchGraph, src: int, dst: Optional[int]):
+        if self.cache is None:
+            return None
+        result = self.cache.get(self.cache_key(name, core, src, dst))
+        if self.stats is not None:
+            self.stats.cache_hit = result is not None
+        return result
 
-if __name__ == "__main__":
-    import tkinter as tk
-    canvas = tk.Canvas()
+    def cache_key(self, name: str, core: SearchGraph, src: NodeRef, dst: Optional[NodeRef]):
+        graph = core if self.cache_graph is None else self.cache_graph
+        return (name, graph, core.version, src, dst)
+
+    def dfs(self, src: NodeRef, dst: Optional[NodeRef]=None, record_parents=False):
+        self.new_stats("dfs")
+        if record_parents:
+            return self.run_search("dfs", traversal.dfs, src, dst, record_parents)
+        return self.cached("dfs", src, dst, lambda: self.run_search("dfs", traversal.dfs, src, dst, False))
+
+    def bfs(self, src: NodeRef, dst: Optional[NodeRef]=None, record_parents=False):
+        self.new_stats("bfs")
+        if record_parents:
+            return self.run_search("bfs", traversal.bfs, src, dst, record_parents)
+        return self.cached("bfs", src, dst, lambda: self.run_search("bfs", traversal.bfs, src, dst, False))
+
+    def run_search(self, name: str, engine, src: NodeRef, dst: Optional[NodeRef], record_parents: bool):
+        stats = self.stats
+        with timed(stats, "setup"):
+            core, to_item = self.resolve(src)
+            src = self.node_id(src)
+            parents = traversal.new_parents(core) if record_parents else None
+            roots = self.restart_ids(core, stats)
+        with timed(stats, "search"):
+            visited, found = engine(core, src, self.node_id(dst), roots, parents, stats)
+        if record_parents:
+            self.search_tree = (name, core, core.version, src, parents)
+        with timed(stats, "convert"):
+            return ([to_item(node) for node in visited], found)
+
+    # Rebuilds src -> dst from the parent table of the last BFS recorded from
+    # src; only when that BFS never reached dst is a new one run.
+    def shortest_path(self, src: NodeRef, dst: NodeRef):
+        stats = self.new_stats("shortest_path")
+        with timed(stats, "setup"):
+            core, to_item = self.resolve(src)
+            src = self.node_id(src)
+            dst = self.node_id(dst)
+            if not core.components().connected(src, dst):
+                return ([], False)
+        path = None
+        with timed(stats, "search"):
+            if self.search_tree is not None and self.search_tree[:4] == ("bfs", core, core.version, src):
+                path = traversal.path_to(self.search_tree[4], src, dst)
+                if stats is not None:
+                    stats.cache_hit = path is not None
+            if path is None:
+                parents = traversal.new_parents(core)
+                traversal.bfs(core, src, dst, parents=parents, stats=stats)
+                self.search_tree = ("bfs", core, core.version, src, parents)
+                path = traversal.path_to(parents, src, dst)
+        if path is None:
+            return ([], False)
+        with timed(stats, "convert"):
+            return ([to_item(node) for node in path], True)
+
+    def iter_dfs(self, src: NodeRef, stop: Optional[Callable[[NodeRef], bool]]=None):
+        return self.iter_steps("dfs", traversal.iter_dfs, src, stop)
+
+    def iter_bfs(self, src: NodeRef, stop: Optional[Callable[[NodeRef], bool]]=None):
+        return self.iter_steps("bfs", traversal.iter_bfs, src, stop)
 
+    # Counters of a stepped search fill in as the caller consumes the steps.
+    def iter_steps(self, name: str, engine, src: NodeRef, stop: Optional[Callable[[NodeRef], bool]]):
+        stats = self.new_stats(name)
+        core, to_item = self.resolve(src)
+        if stop is not None:
+            item_stop = stop
+            stop = lambda node: item_stop(to_item(node))
+        for node, depth, parent in engine(core, self.node_id(src), self.restart_ids(core, stats), stop, stats):
+            yield (to_item(node), depth, None if parent is None else to_item(parent))
 
-   
-    nodes: List[Node] = [Node(canvas, str(i), i*100, i*100) for i in range(7)]
-    nodes[0].add_edge(nodes[1])
-    nodes[0].add_edge(nodes[2])
-    nodes[0].add_edge(nodes[4])
-    nodes[1].add_edge(nodes[3])
-    nodes[1].add_edge(nodes[5])
-    nodes[2].add_edge(nodes[6])
-    nodes[4].add_edge(nodes[5])
+    def reachable(self, src: NodeRef, dst: NodeRef) -> bool:
+        core, _ = self.resolve(src)
+        components = core.components()
+        if not components.connected(self.node_id(src), self.node_id(dst)):
+            return False
+        if components.symmetric:
+            return True
+        return self.bidirectional_bfs(src, dst)[1]
+
+    def bidirectional_bfs(self, src: NodeRef, dst: NodeRef):
+        stats = self.new_stats("bidirectional_bfs")
+        def compute():
+            with timed(stats, "setup"):
+                core, to_item = self.resolve(src)
+                if not core.components().connected(self.node_id(src), self.node_id(dst)):
+                    return ([], False)
+            with timed(stats, "search"):
+                path = traversal.bidirectional_bfs(core, self.node_id(src), self.node_id(dst), stats)
+            if path is None:
+                return ([], False)
+            with timed(stats, "convert"):
+                return ([to_item(node) for node in path], True)
+        return self.cached("bidirectional_bfs", src, dst, compute)
+
+    def hop_distances(self, sources: List[NodeRef]):
+        stats = self.new_stats("hop_distances")
+        core, _ = self.resolve(sources[0]) if sources else (self.core, None)
+        with timed(stats, "search"):
+            return hop_distance.hop_distances(core, [self.node_id(src) for src in sources], stats)
+
+    def parallel_bfs(self, src: NodeRef, workers: int=4):
+        stats = self.new_stats("parallel_bfs")
+        core, _ = self.resolve(src)
+        with timed(stats, "search"):
+            return parallel_bfs.parallel_bfs(core, self.node_id(src), workers, stats=stats)
+
+    def level_bfs(self, src: NodeRef, mode: str=direction_bfs.AUTO):
+        stats = self.new_stats("level_bfs")
+        core, _ = self.resolve(src)
+        with timed(stats, "search"):
+            result = direction_bfs.level_bfs(core, self.node_id(src), mode)
+        if stats is not None:
+            for level in result[2]:
+                stats.nodes_expanded += level.frontier
+                stats.peak_frontier = max(stats.peak_frontier, level.frontier)
+                stats.edges_scanned += level.edges_examined
+        return result
+
+    def iddfs(self, src: NodeRef, dst: Optional[NodeRef]):
+        stats = self.new_stats("iddfs")
+        def compute():
+            core, to_item = self.resolve(src)
+            with timed(stats, "search"):
+                paths, found = traversal.iddfs(core, self.node_id(src), self.node_id(dst), stats)
+            with timed(stats, "convert"):
+                return ({depth: [to_item(node) for node in path] for depth, path in paths.items()}, found)
+        return self.cached("iddfs", src, dst, compute)
+
+    def iter_iddfs(self, src: NodeRef, dst: Optional[NodeRef]=None):
+        stats = self.new_stats("iddfs")
+        core, to_item = self.resolve(src)
+        for level, depth, node in traversal.iter_iddfs(core, self.node_id(src), self.node_id(dst), stats):
+            yield (level, depth, to_item(node))
+
+
+
+if __name__ == "__main__":
+    graph = SearchGraph()
+    nodes: List[int] = [graph.add_node(str(i)) for i in range(7)]
+    graph.add_edge(nodes[0], nodes[1])
+    graph.add_edge(nodes[0], nodes[2])
+    graph.add_edge(nodes[0], nodes[4])
+    graph.add_edge(nodes[1], nodes[3])
+    graph.add_edge(nodes[1], nodes[5])
+    graph.add_edge(nodes[2], nodes[6])
+    graph.add_edge(nodes[4], nodes[5])
 
     searcher = location()
-    searcher.set_graph(nodes)
-  
-    print(searcher.iddfs(nodes[0], None))
+    searcher.set_graph(graph)
+
+    paths, found = searcher.iddfs(nodes[0], None)
+    print({depth: [graph.name(node) for node in path] for depth, path in paths.items()}, found)
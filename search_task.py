@@ -0,0 +1,140 @@
+import queue
+import threading
+from time import perf_counter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from core import traversal
+from core.instrument import SearchStats
+from graphics.node_edge import Node
+from search_algos import location
+
+# Seconds between "progress" messages from a running DFS or BFS.
+PROGRESS_INTERVAL = 0.1
+# Searches whose results go through the searcher's cache.
+CACHED_CHOICES = ("DFS", "BFS", "IDDFS")
+
+
+class SearchResult(NamedTuple):
+    path: List[Any]
+    found: bool
+    route: Optional[List[Any]] = None
+    levels: Optional[Dict[int, List[Any]]] = None
+    stats: Optional[SearchStats] = None
+    parents: Optional[List[Any]] = None
+
+
+# Runs one search on a worker thread over a snapshot of the graph. The thread
+# only talks to the UI through messages, (kind, payload) tuples polled from
+# the main thread: "progress" with a status line, "level" with one finished
+# IDDFS level, then exactly one of "done" (a SearchResult), "cancelled" or
+# "error". cancel() is checked between steps, so the search stops promptly.
+# A repeat of a cached query is answered here on the UI thread, against the
+# live graph and its version, and only a miss pays for the snapshot.
+class SearchTask:
+    def __init__(self, searcher: location, choice: str, src: Node, dst: Optional[Node]):
+        self.choice = choice
+        self.src = src.id
+        self.dst = None if dst is None else dst.id
+        self.hit: Optional[SearchResult] = None
+        if choice in CACHED_CHOICES:
+            stats = searcher.new_stats(choice.lower())
+            self.hit = searcher.lookup("task_" + choice.lower(), src.search_graph, self.src, self.dst)
+            if self.hit is not None and stats is not None:
+                self.hit = self.hit._replace(stats=stats)
+        self.searcher = searcher if self.hit is not None else searcher.snapshot(src)
+        self.items = src.search_graph.items if self.hit is not None else self.searcher.core.items
+        self.messages: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    @property
+    def running(self) -> bool:
+        return self.thread.is_alive()
+
+    def run(self):
+        try:
+            result = self.search()
+        except Exception as error:
+            self.messages.put(("error", error))
+            return
+        if self.cancelled.is_set():
+            self.messages.put(("cancelled", None))
+        else:
+            self.messages.put(("done", result))
+
+    # DFS, BFS and IDDFS results go through the searcher's cache, which the
+    # snapshot shares with the UI's searcher, so re-running a query on an
+    # unchanged graph skips the walk. A hit reports fresh stats marked cached.
+    def search(self) -> Optional[SearchResult]:
+        if self.hit is not None:
+            return self.hit
+        if self.choice == "DFS":
+            compute = lambda: self.walk(self.searcher.iter_dfs, False)
+        elif self.choice == "BFS":
+            compute = lambda: self.walk(self.searcher.iter_bfs, self.dst is not None)
+        elif self.choice == "IDDFS":
+            compute = self.iddfs
+        else:
+            compute = None
+        if compute is not None:
+            stats = self.searcher.new_stats(self.choice.lower())
+            result = self.searcher.cached("task_" + self.choice.lower(), self.src, self.dst, compute)
+            if result is not None and stats is not None and stats.cache_hit:
+                result = result._replace(stats=stats)
+            return result
+        path, found = self.searcher.bidirectional_bfs(self.src, self.dst)
+        path = self.to_items(path)
+        return SearchResult(path, found, stats=self.searcher.stats, parents=[None] + path[:-1])
+
+    def walk(self, steps, record_parents: bool) -> Optional[SearchResult]:
+        dst = self.dst
+        cancelled = self.cancelled
+        parents = traversal.new_parents(self.searcher.core) if record_parents else None
+        order: List[int] = []
+        tree: List[Optional[int]] = []
+        found = False
+        last = perf_counter()
+        for node, _, parent in steps(self.src, lambda node: node == dst or cancelled.is_set()):
+            order.append(node)
+            tree.append(parent)
+            if parents is not None and parent is not None:
+                parents[node] = parent
+            if node == dst:
+                found = True
+            if len(order) & 255 == 0 and perf_counter() - last > PROGRESS_INTERVAL:
+                last = perf_counter()
+                self.messages.put(("progress", f"Visited {len(order)} nodes..."))
+        if cancelled.is_set():
+            return None
+        route = None
+        if found and parents is not None:
+            route = self.to_items(traversal.path_to(parents, self.src, dst))
+        return SearchResult(self.to_items(order), found, route, stats=self.searcher.stats, parents=self.to_items(tree))
+
+    def iddfs(self) -> Optional[SearchResult]:
+        dst = self.dst
+        levels: Dict[int, List[int]] = {}
+        found = False
+        for level, depth, node in self.searcher.iter_iddfs(self.src, dst):
+            if self.cancelled.is_set():
+                return None
+            if level not in levels:
+                if levels:
+                    self.messages.put(("level", (level - 1, self.to_items(levels[level - 1]))))
+                levels[level] = []
+            levels[level].append(node)
+            if node == dst and depth == level:
+                found = True
+        if levels:
+            self.messages.put(("level", (len(levels) - 1, self.to_items(levels[len(levels) - 1]))))
+        return SearchResult([], found, levels={level: self.to_items(path) for level, path in levels.items()},
+                            stats=self.searcher.stats)
+
+    def to_items(self, node_ids: List[Optional[int]]) -> List[Any]:
+        return [None if node is None else self.items[node] for node in node_ids]
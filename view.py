@@ -1,14 +1,20 @@
+import queue
 import tkinter as tk
 from tkinter import ttk
 from graphics.graph import Graph
 from graphics.node_edge import Node, Edge
 from search_algos import location
+from search_task import SearchTask, SearchResult
+
+# Milliseconds between checks of a running search's messages.
+POLL_INTERVAL = 50
 
 class View:
     def __init__(self, parent):
         self.container = parent
         self.searcher: location = None
         self.nodes = []
+        self.task: SearchTask = None
 
     def set_searcher(self, searcher):
         self.searcher = searcher
@@ -31,7 +37,7 @@ class View:
         self.choice.set("DFS")
 
         self.options = ttk.Combobox(self.algo_frame, textvariable=self.choice, style='Custom.TCombobox')  
-        self.options['values'] = ("DFS", "BFS", "IDDFS")
+        self.options['values'] = ("DFS", "BFS", "IDDFS", "Bidirectional BFS")
         self.options.pack()
         
         self.spacing_frame1 = ttk.Frame(self.left_frame, padding=5, height=10, style='Custom.TFrame') 
@@ -70,31 +76,40 @@ class View:
             if not isinstance(dst, Node):
                 dst = None
             if src:
+                if self.task is not None and self.task.running:
+                    return
                 choice = self.choice.get()
-                if choice == "DFS":
-                    output, found = self.searcher.dfs(src, dst)
-                    if output:
-                        output = "Path: " + " -> ".join([node.tag[1:] for node in output])
-                elif choice == "BFS":
-                    output, found = self.searcher.bfs(src, dst)
-                    if output:
-                        output = "Path: " + " -> ".join([node.tag[1:] for node in output])
-                elif choice == "IDDFS":
-                    output, found = self.searcher.iddfs(src, dst)
-                    if output:
-                        output = "\n".join([f"Level {depth}: " + " -> ".join([node.tag[1:] for node in path]) for depth, path in output.items()])
-                if dst:
-                    if found:
-                        output += f"\nNode {dst.tag[1:]} Found!"
-
-                self.output_text.config(state="normal")
-                self.output_text.delete(1.0, tk.END)
-                self.output_text.insert(tk.END, output)
-                self.output_text.config(state="disabled")
+                if choice == "Bidirectional BFS" and dst is None:
+                    self.write_output("Select a NODE to find.")
+                    return
+                self.searcher.instrument = self.show_stats.get()
+                self.graph.stop_replay()
+                self.task = SearchTask(self.searcher, choice, src, dst)
+                self.task.start()
+                self.write_output("Searching...")
+                self.search_btn.state(["disabled"])
+                self.cancel_btn.state(["!disabled"])
+                self.container.after(POLL_INTERVAL, self.poll_search)
+
+        def layout_tree():
+            src = self.src_node_cb.get()
+            for node in self.nodes:
+                if node.tag[1:] == src:
+                    self.graph.layout_tree(node)
+                    return
+            self.write_output("Select a Starting NODE.")
+
+        self.show_stats = tk.BooleanVar(value=False)
+        self.stats_check = ttk.Checkbutton(self.setup_frame, text="Show search stats", variable=self.show_stats)
+        self.animate = tk.BooleanVar(value=False)
+        self.animate_check = ttk.Checkbutton(self.setup_frame, text="Animate traversal", variable=self.animate)
 
         self.search_btn_frame = ttk.Frame(self.setup_frame, width=500, style='Custom.TFrame')  
         self.search_btn_frame.pack()
         self.search_btn = ttk.Button(self.search_btn_frame, text="RUN", command=search, style='Spotify.TButton')  
+        self.cancel_btn = ttk.Button(self.search_btn_frame, text="CANCEL", command=self.cancel_search, style='Spotify.TButton')
+        self.cancel_btn.state(["disabled"])
+        self.layout_btn = ttk.Button(self.search_btn_frame, text="TREE LAYOUT", command=layout_tree, style='Spotify.TButton')
 
 
         self.graph = Graph(self.canvas_frame, self.nodes, bg="white", width=800, height=600, bd=1, relief=tk.SUNKEN)
@@ -111,6 +126,65 @@ class View:
         style.map('Spotify.TCombobox', background=[('disabled', 'gray')])  
         style.configure('Spotify.TButton', background='#1DB954', foreground='black')
 
+    # Drains the running task's messages, then polls again until it reports
+    # how it finished, so the Tk loop is never blocked by the search itself.
+    def poll_search(self):
+        task = self.task
+        while True:
+            try:
+                kind, payload = task.messages.get_nowait()
+            except queue.Empty:
+                self.container.after(POLL_INTERVAL, self.poll_search)
+                return
+            if kind == "progress":
+                self.write_output(payload)
+            elif kind == "level":
+                level, nodes = payload
+                line = f"Level {level}: " + " -> ".join(node.tag[1:] for node in nodes)
+                self.append_output("\n" + line) if level else self.write_output(line)
+            else:
+                break
+        if kind == "done":
+            self.write_output(self.format_result(task, payload))
+            if self.animate.get() and payload.parents is not None:
+                self.graph.replay_search(payload.path, payload.parents)
+        elif kind == "cancelled":
+            self.append_output("\nSearch cancelled.")
+        else:
+            self.write_output(f"Search failed: {payload}")
+        self.search_btn.state(["!disabled"])
+        self.cancel_btn.state(["disabled"])
+
+    def cancel_search(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    def format_result(self, task: SearchTask, result: SearchResult) -> str:
+        if task.choice == "IDDFS":
+            output = "\n".join(f"Level {level}: " + " -> ".join(node.tag[1:] for node in path) for level, path in result.levels.items())
+        elif task.choice == "Bidirectional BFS":
+            output = "Shortest Path: " + " -> ".join(node.tag[1:] for node in result.path) if result.path else "No path."
+        else:
+            output = "Path: " + " -> ".join(node.tag[1:] for node in result.path) if result.path else ""
+            if result.route:
+                output += "\nRoute: " + " -> ".join(node.tag[1:] for node in result.route)
+        if task.dst is not None and result.found:
+            output += f"\nNode {task.items[task.dst].tag[1:]} Found!"
+        if result.stats is not None:
+            output += "\n\n" + str(result.stats)
+        return output
+
+    def write_output(self, text: str):
+        self.output_text.config(state="normal")
+        self.output_text.delete(1.0, tk.END)
+        self.output_text.insert(tk.END, text)
+        self.output_text.config(state="disabled")
+
+    def append_output(self, text: str):
+        self.output_text.config(state="normal")
+        self.output_text.insert(tk.END, text)
+        self.output_text.config(state="disabled")
+
     def setup_layout(self):
         self.main_pane.add(self.canvas_frame)  
         self.main_pane.add(self.left_frame)    
@@ -123,7 +197,11 @@ class View:
         self.setup_frame.pack(anchor=tk.NW, fill=tk.X, expand=True)
         self.src_frame.pack(fill=tk.X, expand=True)
         self.dst_frame.pack(fill=tk.X, expand=True)
+        self.stats_check.pack(anchor=tk.W, padx=5)
+        self.animate_check.pack(anchor=tk.W, padx=5)
         self.search_btn.pack(fill=tk.X)
+        self.cancel_btn.pack(fill=tk.X)
+        self.layout_btn.pack(fill=tk.X)
 
         self.create_spacing(self.left_frame, pad_top=5, pad_bottom=5, show_sep=False)
 